@@ -0,0 +1,33 @@
+#!/usr/bin/env bash
+# Executa a suíte de testes. Testes marcados com 'integration' ficam de fora
+# da execução padrão (ver tests/conftest.py).
+# Exemplo de uso:
+#   scripts/unittest.sh              # testes unitários
+#   scripts/unittest.sh report       # idem, listando os 20 testes mais lentos
+#   scripts/unittest.sh integration  # apenas os testes de integração (CI)
+# Argumentos extras são repassados ao pytest.
+#
+# Paralelismo: pytest.ini já aplica `-n auto --dist=loadfile` (pytest-xdist),
+# mantendo cada arquivo em um único worker. O ambiente é alterado apenas via
+# monkeypatch, então os workers não colidem. Para depurar em série, use `-n0`.
+
+set -euo pipefail
+
+MODE=${1:-}
+[ $# -gt 0 ] && shift
+
+case "${MODE}" in
+  "")
+    python -m pytest -q "$@"
+    ;;
+  report)
+    python -m pytest -q --durations=20 "$@"
+    ;;
+  integration)
+    python -m pytest -q -m integration "$@"
+    ;;
+  *)
+    echo "Modo desconhecido: ${MODE} (use: report | integration)" >&2
+    exit 1
+    ;;
+esac
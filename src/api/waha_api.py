@@ -11,11 +11,12 @@ Endpoints principais:
 import os
 import time
 import asyncio
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from typing import Callable, Optional, Dict, Any
 from uuid import uuid4
 
 import jwt
-from fastapi import FastAPI, Depends, HTTPException, Header, Request
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Header, Request
 from pydantic import BaseModel, Field, field_validator
 from loguru import logger
 from pathlib import Path
@@ -62,14 +63,17 @@ class JWTAuth:
 
 
 class RateLimiter:
-    def __init__(self, limit_per_minute: Optional[int] = None) -> None:
+    def __init__(self, limit_per_minute: Optional[int] = None,
+                 clock: Callable[[], float] = time.time) -> None:
         self.limit = int(os.getenv("RATE_LIMIT_PER_MINUTE",
                          str(limit_per_minute or 60)))
+        # Fonte de tempo substituível (ex.: relógio fixo em testes)
+        self.clock = clock
         self._store: Dict[str, Dict[str, Any]] = {}
         self._lock = asyncio.Lock()
 
     async def allow(self, identity: str) -> bool:
-        now = int(time.time())
+        now = int(self.clock())
         window = now // 60
         async with self._lock:
             entry = self._store.get(identity)
@@ -148,30 +152,37 @@ class ThumbRequest(BaseModel):
         return v
 
 
-def create_app() -> FastAPI:
-    app = FastAPI(title="WhatsApp API (WAHA)", version="1.0.0")
+class LocalFsStorage:
+    """Armazenamento local dos eventos de webhook em `<base_dir>/webhooks`."""
 
-    auth = JWTAuth()
-    rate_limiter = RateLimiter()
-    app.state.rate_limiter = rate_limiter
+    def __init__(self, base_dir: Path) -> None:
+        self.target = base_dir / "webhooks"
 
-    if WahaClient is not None:
-        app.state.wpp_client = WahaClient()
-    else:
-        app.state.wpp_client = None
+    def save(self, filename: str, body: bytes) -> str:
+        """Grava `body` em disco e retorna o caminho do arquivo."""
+        self.target.mkdir(parents=True, exist_ok=True)
+        path = self.target / filename
+        path.write_bytes(body)
+        return str(path)
 
-    @app.middleware("http")
-    async def add_request_id_logging(request: Request, call_next):
-        """Middleware que injeta `X-Request-ID` e loga duração da requisição."""
-        request_id = request.headers.get("X-Request-ID") or str(uuid4())
-        start = time.perf_counter()
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        duration_ms = (time.perf_counter() - start) * 1000
-        logger.info(
-            f"{request.method} {request.url.path} rid={request_id} dur={duration_ms:.2f}ms status={response.status_code}"
-        )
-        return response
+
+def get_storage() -> LocalFsStorage:
+    """Dependência do armazenamento local (substituível via `dependency_overrides`)."""
+    base_dir: Path = config.data_dir if hasattr(
+        config, "data_dir") else Path("data")
+    return LocalFsStorage(base_dir)
+
+
+def _require_auth(request: Request, authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
+    """Dependência que delega ao `JWTAuth` configurado no app da requisição."""
+    return request.app.state.auth.require(authorization)
+
+
+@lru_cache(maxsize=None)
+def _build_router() -> APIRouter:
+    """Monta as rotas uma única vez; o estado de runtime (auth, rate limit,
+    cliente WAHA) é lido de `request.app.state` a cada requisição."""
+    router = APIRouter()
 
     # Sessões WAHA
 
@@ -192,75 +203,75 @@ def create_app() -> FastAPI:
         url: str = Field(...,
                          description="URL pública para receber eventos do WAHA")
 
-    @app.post("/whatsapp/session/create")
-    async def session_create(req: SessionRequest, payload: Dict[str, Any] = Depends(auth.require), request: Request = None):
+    @router.post("/whatsapp/session/create")
+    async def session_create(req: SessionRequest, request: Request, payload: Dict[str, Any] = Depends(_require_auth)):
         """Cria uma sessão WAHA pelo nome especificado."""
         identity = get_identity(payload, request)
-        if not await app.state.rate_limiter.allow(identity):
+        if not await request.app.state.rate_limiter.allow(identity):
             raise HTTPException(status_code=429, detail="Rate limit excedido")
         try:
             # type: ignore
-            result = await app.state.wpp_client.create_session(req.name)
+            result = await request.app.state.wpp_client.create_session(req.name)
             return {"success": True, "result": result}
         except Exception as e:
             logger.error(f"Erro ao criar sessão: {e}")
             raise HTTPException(
                 status_code=500, detail="Erro interno ao criar sessão")
 
-    @app.post("/whatsapp/session/start")
-    async def session_start(req: SessionRequest, payload: Dict[str, Any] = Depends(auth.require), request: Request = None):
+    @router.post("/whatsapp/session/start")
+    async def session_start(req: SessionRequest, request: Request, payload: Dict[str, Any] = Depends(_require_auth)):
         """Inicia uma sessão WAHA pelo nome."""
         identity = get_identity(payload, request)
-        if not await app.state.rate_limiter.allow(identity):
+        if not await request.app.state.rate_limiter.allow(identity):
             raise HTTPException(status_code=429, detail="Rate limit excedido")
         try:
             # type: ignore
-            result = await app.state.wpp_client.start_session(req.name)
+            result = await request.app.state.wpp_client.start_session(req.name)
             return {"success": True, "result": result}
         except Exception as e:
             logger.error(f"Erro ao iniciar sessão: {e}")
             raise HTTPException(
                 status_code=500, detail="Erro interno ao iniciar sessão")
 
-    @app.post("/whatsapp/session/stop")
-    async def session_stop(req: SessionRequest, payload: Dict[str, Any] = Depends(auth.require), request: Request = None):
+    @router.post("/whatsapp/session/stop")
+    async def session_stop(req: SessionRequest, request: Request, payload: Dict[str, Any] = Depends(_require_auth)):
         """Para uma sessão WAHA pelo nome."""
         identity = get_identity(payload, request)
-        if not await app.state.rate_limiter.allow(identity):
+        if not await request.app.state.rate_limiter.allow(identity):
             raise HTTPException(status_code=429, detail="Rate limit excedido")
         try:
             # type: ignore
-            result = await app.state.wpp_client.stop_session(req.name)
+            result = await request.app.state.wpp_client.stop_session(req.name)
             return {"success": True, "result": result}
         except Exception as e:
             logger.error(f"Erro ao parar sessão: {e}")
             raise HTTPException(
                 status_code=500, detail="Erro interno ao parar sessão")
 
-    @app.get("/whatsapp/session/{name}/status")
-    async def session_status(name: str, payload: Dict[str, Any] = Depends(auth.require), request: Request = None):
+    @router.get("/whatsapp/session/{name}/status")
+    async def session_status(name: str, request: Request, payload: Dict[str, Any] = Depends(_require_auth)):
         """Obtém status de uma sessão WAHA pelo nome."""
         identity = get_identity(payload, request)
-        if not await app.state.rate_limiter.allow(identity):
+        if not await request.app.state.rate_limiter.allow(identity):
             raise HTTPException(status_code=429, detail="Rate limit excedido")
         try:
             # type: ignore
-            result = await app.state.wpp_client.get_session_status(name)
+            result = await request.app.state.wpp_client.get_session_status(name)
             return {"success": True, "result": result}
         except Exception as e:
             logger.error(f"Erro ao obter status da sessão: {e}")
             raise HTTPException(
                 status_code=500, detail="Erro interno ao obter status da sessão")
 
-    @app.post("/whatsapp/webhook/register")
-    async def webhook_register(req: WebhookRequest, payload: Dict[str, Any] = Depends(auth.require), request: Request = None):
+    @router.post("/whatsapp/webhook/register")
+    async def webhook_register(req: WebhookRequest, request: Request, payload: Dict[str, Any] = Depends(_require_auth)):
         """Registra webhook do WAHA para eventos (mensagens, status, etc.)."""
         identity = get_identity(payload, request)
-        if not await app.state.rate_limiter.allow(identity):
+        if not await request.app.state.rate_limiter.allow(identity):
             raise HTTPException(status_code=429, detail="Rate limit excedido")
         try:
             # type: ignore
-            result = await app.state.wpp_client.register_webhook(req.url)
+            result = await request.app.state.wpp_client.register_webhook(req.url)
             return {"success": True, "result": result}
         except Exception as e:
             logger.error(f"Erro ao registrar webhook: {e}")
@@ -271,8 +282,8 @@ def create_app() -> FastAPI:
     # Webhook inbound (eventos do WAHA)
     # ----------------------
 
-    @app.post("/whatsapp/webhook/events")
-    async def webhook_events(request: Request):
+    @router.post("/whatsapp/webhook/events")
+    async def webhook_events(request: Request, storage: LocalFsStorage = Depends(get_storage)):
         """Recebe eventos do WAHA, valida HMAC e persiste (S3 ou local)."""
         try:
             body_bytes = await request.body()
@@ -291,7 +302,7 @@ def create_app() -> FastAPI:
 
             payload = await request.json()
             # Persistência
-            stored, location = await _persist_webhook_event(body_bytes, request_id)
+            stored, location = await _persist_webhook_event(body_bytes, request_id, storage)
             logger.info(
                 f"Webhook evento recebido: keys={list(payload.keys())} stored={stored} location={location}")
             return {"ok": True, "stored": stored, "location": location}
@@ -302,7 +313,7 @@ def create_app() -> FastAPI:
             raise HTTPException(
                 status_code=500, detail="Erro interno ao processar webhook")
 
-    async def _persist_webhook_event(body: bytes, request_id: str) -> Tuple[bool, str]:
+    async def _persist_webhook_event(body: bytes, request_id: str, storage: LocalFsStorage) -> Tuple[bool, str]:
         """Persiste o corpo do webhook em S3 (se disponível) ou localmente. Retorna `(stored, location)`."""
         ts = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
         filename = f"{ts}_{request_id}.json"
@@ -320,27 +331,21 @@ def create_app() -> FastAPI:
                     f"Falha ao salvar webhook no S3: {e}. Usando armazenamento local.")
         # Salva localmente
         try:
-            base_dir: Path = config.data_dir if hasattr(
-                config, "data_dir") else Path("data")
-            target = base_dir / "webhooks"
-            target.mkdir(parents=True, exist_ok=True)
-            path = target / filename
-            path.write_bytes(body)
-            return True, str(path)
+            return True, storage.save(filename, body)
         except Exception as e:
             logger.error(f"Falha ao salvar webhook localmente: {e}")
             return False, ""
 
-    @app.post("/whatsapp/text")
-    async def send_text(req: TextMessageRequest, payload: Dict[str, Any] = Depends(auth.require), request: Request = None):
+    @router.post("/whatsapp/text")
+    async def send_text(req: TextMessageRequest, request: Request, payload: Dict[str, Any] = Depends(_require_auth)):
         """Envia texto via WAHA."""
         identity = get_identity(payload, request)
-        allowed = await app.state.rate_limiter.allow(identity)
+        allowed = await request.app.state.rate_limiter.allow(identity)
         if not allowed:
             raise HTTPException(status_code=429, detail="Rate limit excedido")
 
         try:
-            client = app.state.wpp_client
+            client = request.app.state.wpp_client
             # type: ignore
             result = await client.send_text(req.to, req.message)
             return {"success": True, "result": result}
@@ -351,16 +356,16 @@ def create_app() -> FastAPI:
             raise HTTPException(
                 status_code=500, detail="Erro interno ao enviar texto")
 
-    @app.post("/whatsapp/image")
-    async def send_image(req: ImageMessageRequest, payload: Dict[str, Any] = Depends(auth.require), request: Request = None):
+    @router.post("/whatsapp/image")
+    async def send_image(req: ImageMessageRequest, request: Request, payload: Dict[str, Any] = Depends(_require_auth)):
         """Envia imagem (URL ou base64) via WAHA."""
         identity = get_identity(payload, request)
-        allowed = await app.state.rate_limiter.allow(identity)
+        allowed = await request.app.state.rate_limiter.allow(identity)
         if not allowed:
             raise HTTPException(status_code=429, detail="Rate limit excedido")
 
         try:
-            client = app.state.wpp_client
+            client = request.app.state.wpp_client
             if not (req.image_url or req.image_base64):
                 raise HTTPException(
                     status_code=400, detail="Informe 'image_url' ou 'image_base64'")
@@ -374,16 +379,16 @@ def create_app() -> FastAPI:
             raise HTTPException(
                 status_code=500, detail="Erro interno ao enviar imagem")
 
-    @app.post("/whatsapp/ptt")
-    async def send_ptt(req: PttRequest, payload: Dict[str, Any] = Depends(auth.require), request: Request = None):
+    @router.post("/whatsapp/ptt")
+    async def send_ptt(req: PttRequest, request: Request, payload: Dict[str, Any] = Depends(_require_auth)):
         """Envia áudio PTT via WAHA."""
         identity = get_identity(payload, request)
-        allowed = await app.state.rate_limiter.allow(identity)
+        allowed = await request.app.state.rate_limiter.allow(identity)
         if not allowed:
             raise HTTPException(status_code=429, detail="Rate limit excedido")
 
         try:
-            client = app.state.wpp_client
+            client = request.app.state.wpp_client
             # type: ignore
             result = await client.send_ptt_base64(req.to, req.audio_base64)
             return {"success": True, "result": result}
@@ -394,16 +399,16 @@ def create_app() -> FastAPI:
             raise HTTPException(
                 status_code=500, detail="Erro interno ao enviar PTT")
 
-    @app.post("/whatsapp/thumb")
-    async def send_thumb(req: ThumbRequest, payload: Dict[str, Any] = Depends(auth.require), request: Request = None):
+    @router.post("/whatsapp/thumb")
+    async def send_thumb(req: ThumbRequest, request: Request, payload: Dict[str, Any] = Depends(_require_auth)):
         """Envia mensagem com link e thumbnail via WAHA."""
         identity = get_identity(payload, request)
-        allowed = await app.state.rate_limiter.allow(identity)
+        allowed = await request.app.state.rate_limiter.allow(identity)
         if not allowed:
             raise HTTPException(status_code=429, detail="Rate limit excedido")
 
         try:
-            client = app.state.wpp_client
+            client = request.app.state.wpp_client
             result = await client.send_message_with_thumb(
                 req.to, req.url, req.title, req.description, req.image_base64
             )  # type: ignore
@@ -415,4 +420,34 @@ def create_app() -> FastAPI:
             raise HTTPException(
                 status_code=500, detail="Erro interno ao enviar thumb")
 
+    return router
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="WhatsApp API (WAHA)", version="1.0.0")
+
+    auth = JWTAuth()
+    rate_limiter = RateLimiter()
+    app.state.auth = auth
+    app.state.rate_limiter = rate_limiter
+
+    if WahaClient is not None:
+        app.state.wpp_client = WahaClient()
+    else:
+        app.state.wpp_client = None
+
+    @app.middleware("http")
+    async def add_request_id_logging(request: Request, call_next):
+        """Middleware que injeta `X-Request-ID` e loga duração da requisição."""
+        request_id = request.headers.get("X-Request-ID") or str(uuid4())
+        start = time.perf_counter()
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        duration_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"{request.method} {request.url.path} rid={request_id} dur={duration_ms:.2f}ms status={response.status_code}"
+        )
+        return response
+
+    app.include_router(_build_router())
     return app
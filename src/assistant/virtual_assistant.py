@@ -4,9 +4,11 @@ Assistente virtual com reconhecimento de intenções e geração de respostas co
 
 import re
 import json
-from typing import Dict, List, Optional, Any, Tuple
+import functools
+from typing import Dict, List, Mapping, Optional, Any, Tuple
 from datetime import datetime
 from dataclasses import dataclass
+from types import MappingProxyType
 from enum import Enum
 from loguru import logger
 
@@ -17,6 +19,12 @@ from scraping.orchestrator import scraping_orchestrator
 from sheets.sync_manager import sheets_sync
 
 
+# Padrões de extração de entidades compilados uma única vez
+URL_PATTERN = re.compile(
+    r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+NUMBER_PATTERN = re.compile(r'\b\d+\b')
+
+
 class IntentType(Enum):
     """Tipos de intenções do assistente."""
     GREETING = "greeting"
@@ -29,12 +37,16 @@ class IntentType(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(frozen=True)
 class Intent:
-    """Representa uma intenção detectada."""
+    """Representa uma intenção detectada.
+
+    Instâncias são compartilhadas pelo cache do `IntentRecognizer`, por isso
+    `entities` é um mapeamento somente leitura com valores imutáveis.
+    """
     type: IntentType
     confidence: float
-    entities: Dict[str, Any]
+    entities: Mapping[str, Any]
     original_text: str
 
 
@@ -79,20 +91,37 @@ class IntentRecognizer:
             ]
         }
 
+        # Compila os padrões na inicialização para evitar lookup a cada mensagem
+        self._compiled_patterns = {
+            intent_type: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for intent_type, patterns in self.patterns.items()
+        }
+
+        # Cache de correspondência exata para mensagens repetidas
+        self._recognize_cached = functools.lru_cache(maxsize=1024)(self._recognize_intent)
+
     def recognize_intent(self, text: str) -> Intent:
         """Reconhece intenção no texto."""
+        return self._recognize_cached(text)
+
+    def clear_cache(self):
+        """Limpa o cache de intenções reconhecidas."""
+        self._recognize_cached.cache_clear()
+
+    def _recognize_intent(self, text: str) -> Intent:
+        """Executa o reconhecimento de intenção sem cache."""
         text_lower = text.lower().strip()
 
         # Análise por padrões
         intent_scores = {}
 
-        for intent_type, patterns in self.patterns.items():
+        for intent_type, patterns in self._compiled_patterns.items():
             max_score = 0
             for pattern in patterns:
-                matches = re.findall(pattern, text_lower, re.IGNORECASE)
+                matches = pattern.findall(text_lower)
                 if matches:
                     # Pontuação baseada no número de matches e tamanho do padrão
-                    score = len(matches) * (len(pattern) / 100)
+                    score = len(matches) * (len(pattern.pattern) / 100)
                     max_score = max(max_score, score)
 
             if max_score > 0:
@@ -141,20 +170,19 @@ class IntentRecognizer:
 
         return scores
 
-    def _extract_entities(self, text: str) -> Dict[str, Any]:
-        """Extrai entidades do texto."""
+    def _extract_entities(self, text: str) -> Mapping[str, Any]:
+        """Extrai entidades do texto (mapeamento somente leitura)."""
         entities = {}
 
         # URLs
-        urls = re.findall(
-            r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', text)
+        urls = URL_PATTERN.findall(text)
         if urls:
-            entities['urls'] = urls
+            entities['urls'] = tuple(urls)
 
         # Números
-        numbers = re.findall(r'\b\d+\b', text)
+        numbers = NUMBER_PATTERN.findall(text)
         if numbers:
-            entities['numbers'] = [int(n) for n in numbers]
+            entities['numbers'] = tuple(int(n) for n in numbers)
 
         # Palavras específicas de sites/modelos
         site_keywords = ['site', 'url', 'página', 'página']
@@ -171,7 +199,7 @@ class IntentRecognizer:
                 entities['mentioned_llm'] = keyword
                 break
 
-        return entities
+        return MappingProxyType(entities)
 
 
 class VirtualAssistant:
@@ -225,7 +253,11 @@ class VirtualAssistant:
                 'intent': {
                     'type': intent.type.value,
                     'confidence': intent.confidence,
-                    'entities': intent.entities
+                    # Cópia com listas novas: a resposta não expõe o Intent em cache
+                    'entities': {
+                        key: list(value) if isinstance(value, tuple) else value
+                        for key, value in intent.entities.items()
+                    }
                 }
             })
 
@@ -592,6 +624,7 @@ class VirtualAssistant:
             ]
         else:
             self.conversation_history.clear()
+            self.intent_recognizer.clear_cache()
 
     def get_stats(self) -> Dict[str, Any]:
         """Obtém estatísticas do assistente."""
@@ -1,40 +1,38 @@
 from pathlib import Path
 from typing import Dict, List, Tuple
 import os
+import re
 import customtkinter as ctk
 
 
 SENSITIVE_HINTS = ("KEY", "SECRET", "PASSWORD", "TOKEN")
 
+# Linhas "NOME=valor" que não são comentários; nome e valor são aparados depois
+_ENV_RE = re.compile(r"^(?![^\S\n]*#)([^=\n]*)=(.*)$", re.MULTILINE)
+
+
+def _normalize_newlines(text: str) -> str:
+    """Troca por LF toda quebra de linha reconhecida por `str.splitlines`.
+
+    Mantém o comportamento anterior à regex, que só divide em LF.
+    """
+    return "\n".join(text.splitlines())
+
 
 def parse_env_example(example_path: Path) -> List[Tuple[str, str]]:
     """Lê o .env.example e retorna lista de pares (nome, valor_default)."""
-    pairs: List[Tuple[str, str]] = []
     if not example_path.exists():
-        return pairs
-    for line in example_path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if "=" in line:
-            name, val = line.split("=", 1)
-            pairs.append((name.strip(), val.strip()))
-    return pairs
+        return []
+    text = _normalize_newlines(example_path.read_text(encoding="utf-8"))
+    return [(name.strip(), val.strip()) for name, val in _ENV_RE.findall(text)]
 
 
 def read_env_values(env_path: Path) -> Dict[str, str]:
     """Lê um arquivo .env e retorna dict de valores (se existir)."""
-    data: Dict[str, str] = {}
     if not env_path.exists():
-        return data
-    for line in env_path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if "=" in line:
-            k, v = line.split("=", 1)
-            data[k.strip()] = v.strip()
-    return data
+        return {}
+    text = _normalize_newlines(env_path.read_text(encoding="utf-8"))
+    return {k.strip(): v.strip() for k, v in _ENV_RE.findall(text)}
 
 
 def write_env_values(env_path: Path, values: Dict[str, str]) -> None:
@@ -8,6 +8,9 @@ except Exception:  # noqa: BLE001
 ThemeMode = Literal["Light", "Dark"]
 AccentPalette = Literal["blue", "green", "dark-blue"]
 
+# Próximo modo para cada modo atual; valores desconhecidos voltam ao claro
+_TOGGLE: dict[str, ThemeMode] = {"Light": "Dark", "Dark": "Light"}
+
 
 def apply_theme(mode: ThemeMode) -> None:
     """Aplica o tema global do customtkinter.
@@ -27,7 +30,7 @@ def toggle_theme(current: ThemeMode) -> ThemeMode:
     Comentário de função: usado pelos callbacks de UI para
     alternância de tema com feedback visual.
     """
-    return "Dark" if current == "Light" else "Light"
+    return _TOGGLE.get(current, "Light")
 
 
 def set_color_theme(name: str = "blue") -> None:
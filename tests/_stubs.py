@@ -0,0 +1,148 @@
+"""Lightweight stand-ins for the external services used by integration tests.
+
+Plain classes with async methods avoid the unittest.mock machinery
+(spec introspection, call tracking on every attribute) on the hot path.
+Each stub records its invocations in ``calls`` and raises ``fail_next``
+once, when set, to exercise error handling. Scraper and vector store
+return fixed payloads unless ``dynamic`` is set, in which case the
+payload is derived from the URL/query.
+"""
+import functools
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+
+def _freeze(data: Dict[str, Any]) -> Mapping[str, Any]:
+    """Read-only view of ``data``, nested dicts included.
+
+    Shared payloads are returned to every caller, so a test that mutates
+    one would otherwise leak the change into later tests on the worker.
+    """
+    return MappingProxyType({
+        key: _freeze(value) if isinstance(value, dict) else value
+        for key, value in data.items()
+    })
+
+
+# Deterministic payloads memoized per input; tests only read them
+@functools.lru_cache(maxsize=256)
+def _scrape_payload(url: str) -> Mapping[str, Any]:
+    return _freeze({
+        "url": url,
+        "title": f"Title for {url}",
+        "content": f"Content from {url}",
+        "scraped_at": "2024-01-01T00:00:00Z",
+        "status_code": 200,
+        "error": None
+    })
+
+
+@functools.lru_cache(maxsize=256)
+def _search_payload(query: str, k: int) -> Tuple[Mapping[str, Any], ...]:
+    return tuple(
+        _freeze({"content": f"Similar content {i} for {query}", "metadata": {"score": 0.9 - i * 0.1}})
+        for i in range(k)
+    )
+
+
+# Fixed payloads for tests that do not inspect input-derived content
+STATIC_SCRAPE_PAYLOAD = _freeze({
+    "url": "https://example.com",
+    "title": "Example Domain",
+    "content": "Example content",
+    "scraped_at": "2024-01-01T00:00:00Z",
+    "status_code": 200,
+    "error": None
+})
+
+STATIC_SEARCH_PAYLOAD = tuple(
+    _freeze({"content": f"Similar example content {i}", "metadata": {"score": 0.9 - i * 0.1}})
+    for i in range(5)
+)
+
+
+class _Stub:
+    """Base stub with call recording and one-shot failure injection."""
+
+    def __init__(self, dynamic: bool = False) -> None:
+        self.calls: List[tuple] = []
+        self.fail_next: Optional[Exception] = None
+        self.dynamic = dynamic
+
+    def _record(self, method: str, *args: Any) -> None:
+        self.calls.append((method, *args))
+        if self.fail_next is not None:
+            error, self.fail_next = self.fail_next, None
+            raise error
+
+    def reset(self) -> None:
+        """Clear recorded calls and any pending failure."""
+        self.calls.clear()
+        self.fail_next = None
+
+
+class StubScraper(_Stub):
+    async def scrape_url(self, url: str, selectors: Dict[str, str] = None) -> Mapping[str, Any]:
+        self._record("scrape_url", url)
+        if self.dynamic:
+            return _scrape_payload(url)
+        return STATIC_SCRAPE_PAYLOAD
+
+    async def scrape_multiple(self, urls: List[str]) -> List[Dict[str, Any]]:
+        self._record("scrape_multiple", urls)
+        return [
+            {"url": "https://example1.com", "title": "Example 1"},
+            {"url": "https://example2.com", "title": "Example 2"}
+        ]
+
+
+class StubVectorStore(_Stub):
+    async def search_similar(self, query: str, k: int = 5) -> List[Mapping[str, Any]]:
+        self._record("search_similar", query, k)
+        if self.dynamic:
+            return list(_search_payload(query, k))
+        return list(STATIC_SEARCH_PAYLOAD[:k])
+
+    async def add_documents(self, documents: List[Dict[str, Any]]) -> bool:
+        self._record("add_documents", documents)
+        return True
+
+    def get_collection_stats(self) -> Dict[str, Any]:
+        self._record("get_collection_stats")
+        return {"documents": 100, "size_mb": 50.5}
+
+
+class StubLLMRouter(_Stub):
+    async def generate_response(self, prompt: str, preferred_provider: str = None):
+        self._record("generate_response", prompt)
+        from src.llm.router import LLMResponse
+        return LLMResponse(
+            content=f"Mock response to: {prompt[:50]}...",
+            provider=preferred_provider or "openai",
+            model="gpt-3.5-turbo",
+            prompt_tokens=10,
+            response_tokens=25,
+            total_tokens=35
+        )
+
+    def select_provider(self, *args: Any, **kwargs: Any) -> str:
+        self._record("select_provider")
+        return "openai"
+
+
+class StubSheetsManager(_Stub):
+    def is_configured(self) -> bool:
+        self._record("is_configured")
+        return True
+
+    async def sync_scraping_data(self, data: Dict[str, Any]) -> bool:
+        self._record("sync_scraping_data", data)
+        return True
+
+    async def sync_rag_data(self, data: Dict[str, Any]) -> bool:
+        self._record("sync_rag_data", data)
+        return True
+
+    async def sync_llm_interactions(self, data: Dict[str, Any]) -> bool:
+        self._record("sync_llm_interactions", data)
+        return True
@@ -1,33 +1,62 @@
 import pytest
 import asyncio
 import sys
-from unittest.mock import Mock, patch, MagicMock, AsyncMock
-from typing import Dict, Any, List, Optional
+from unittest.mock import Mock, patch, AsyncMock
+from typing import Dict, Any, Optional
 import json
 from pathlib import Path
 
 # Adicionar diretório raiz ao PYTHONPATH
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Mock modules before importing
-sys.modules['customtkinter'] = MagicMock()
-sys.modules['customtkinter.windows'] = MagicMock()
-sys.modules['customtkinter.windows.ctk_tk'] = MagicMock()
-sys.modules['customtkinter.windows.widgets'] = MagicMock()
-
 from src.assistant.virtual_assistant import VirtualAssistant, IntentRecognizer, ConversationManager
 from src.assistant.intents import IntentHandler, BaseIntent
-from src.llm.router import LLMRouter, LLMResponse
-from src.rag.vector_store import VectorStore
-from src.scraping.scraper import WebScraper
-from src.sheets.sync_manager import GoogleSheetsSync
-from src.utils.config import Config
+from src.llm.router import LLMResponse
 
 
-@pytest.fixture
+# Single response reused by the LLM router mock
+_STUB_LLM_RESPONSE = LLMResponse(
+    content="Mock response to: <prompt>",
+    provider="openai",
+    model="gpt-3.5-turbo",
+    prompt_tokens=10,
+    response_tokens=20,
+    total_tokens=30
+)
+
+# Precomputed results for the vector store search mock
+_STUB_SIMILAR = [
+    {"content": f"Similar content {i}", "metadata": {"score": 0.9 - i * 0.1}}
+    for i in range(5)
+]
+
+
+def _assert_ok(result: Dict[str, Any], intent_type: str) -> None:
+    """Check the common shape of a successful processing result"""
+    assert isinstance(result, dict)
+    assert result["success"] is True
+    assert result["intent_type"] == intent_type
+    assert result.get("response")
+
+
+class _CustomIntentHandler(BaseIntent):
+    """Custom intent handler used by the registration test"""
+
+    def get_name(self):
+        return "custom"
+
+    async def process(self, message: str, entities: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "response": "Custom intent processed",
+            "data": {"original_message": message}
+        }
+
+
+@pytest.fixture(scope="session")
 def mock_config():
     """Mock configuration"""
-    config = Mock(spec=Config)
+    config = Mock()
     config.base_dir = "/tmp/test"
     config.config_dir = "/tmp/test/config"
     config.data_dir = "/tmp/test/data"
@@ -35,57 +64,36 @@ def mock_config():
     return config
 
 
-@pytest.fixture
-def mock_llm_router():
-    """Mock LLM router"""
-    router = Mock(spec=LLMRouter)
-    
-    async def mock_generate_response(prompt: str, preferred_provider: Optional[str] = None) -> LLMResponse:
-        return LLMResponse(
-            content=f"Mock response to: {prompt}",
-            provider="openai",
-            model="gpt-3.5-turbo",
-            prompt_tokens=10,
-            response_tokens=20,
-            total_tokens=30
-        )
-    
-    router.generate_response = AsyncMock(side_effect=mock_generate_response)
+async def _mock_scrape_url(url: str, selectors: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    return {
+        "url": url,
+        "title": f"Title for {url}",
+        "content": f"Content from {url}",
+        "scraped_at": "2024-01-01T00:00:00Z",
+        "selectors": selectors or {}
+    }
+
+
+def _make_llm_router():
+    """Build LLM router mock"""
+    router = Mock()
+    router.generate_response = AsyncMock(return_value=_STUB_LLM_RESPONSE)
     router.select_provider = Mock(return_value="openai")
     return router
 
 
-@pytest.fixture
-def mock_vector_store():
-    """Mock vector store"""
-    store = Mock(spec=VectorStore)
-    
-    async def mock_search_similar(query: str, k: int = 5) -> List[Dict[str, Any]]:
-        return [
-            {"content": f"Similar content {i} for {query}", "metadata": {"score": 0.9 - i * 0.1}}
-            for i in range(k)
-        ]
-    
-    store.search_similar = AsyncMock(side_effect=mock_search_similar)
+def _make_vector_store():
+    """Build vector store mock"""
+    store = Mock()
+    store.search_similar = AsyncMock(side_effect=lambda query, k=5: _STUB_SIMILAR[:k])
     store.add_documents = AsyncMock(return_value=True)
     return store
 
 
-@pytest.fixture
-def mock_scraper():
-    """Mock web scraper"""
-    scraper = Mock(spec=WebScraper)
-    
-    async def mock_scrape_url(url: str, selectors: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-        return {
-            "url": url,
-            "title": f"Title for {url}",
-            "content": f"Content from {url}",
-            "scraped_at": "2024-01-01T00:00:00Z",
-            "selectors": selectors or {}
-        }
-    
-    scraper.scrape_url = AsyncMock(side_effect=mock_scrape_url)
+def _make_scraper():
+    """Build web scraper mock"""
+    scraper = Mock()
+    scraper.scrape_url = AsyncMock(side_effect=_mock_scrape_url)
     scraper.scrape_multiple = AsyncMock(return_value=[
         {"url": "https://example1.com", "title": "Title 1"},
         {"url": "https://example2.com", "title": "Title 2"}
@@ -93,10 +101,9 @@ def mock_scraper():
     return scraper
 
 
-@pytest.fixture
-def mock_sheets_manager():
-    """Mock Google Sheets manager"""
-    sheets = Mock(spec=GoogleSheetsSync)
+def _make_sheets_manager():
+    """Build Google Sheets manager mock"""
+    sheets = Mock()
     sheets.is_configured = Mock(return_value=True)
     sheets.sync_scraping_data = AsyncMock(return_value=True)
     sheets.sync_rag_data = AsyncMock(return_value=True)
@@ -104,6 +111,30 @@ def mock_sheets_manager():
     return sheets
 
 
+@pytest.fixture
+def mock_llm_router():
+    """Mock LLM router"""
+    return _make_llm_router()
+
+
+@pytest.fixture
+def mock_vector_store():
+    """Mock vector store"""
+    return _make_vector_store()
+
+
+@pytest.fixture
+def mock_scraper():
+    """Mock web scraper"""
+    return _make_scraper()
+
+
+@pytest.fixture
+def mock_sheets_manager():
+    """Mock Google Sheets manager"""
+    return _make_sheets_manager()
+
+
 @pytest.fixture
 def intent_recognizer(mock_llm_router):
     """Create intent recognizer with mocked LLM"""
@@ -131,6 +162,18 @@ def virtual_assistant(mock_config, mock_llm_router, mock_vector_store, mock_scra
     return assistant
 
 
+@pytest.fixture(scope="module")
+def shared_virtual_assistant(mock_config):
+    """Virtual assistant built once per module for the integration tests"""
+    return VirtualAssistant(
+        config=mock_config,
+        llm_router=_make_llm_router(),
+        vector_store=_make_vector_store(),
+        scraper=_make_scraper(),
+        sheets_manager=_make_sheets_manager()
+    )
+
+
 class TestIntentRecognizer:
     """Test cases for Intent Recognizer"""
     
@@ -140,80 +183,70 @@ class TestIntentRecognizer:
         assert recognizer.llm_router == mock_llm_router
         assert recognizer.intent_patterns is not None
     
-    def test_recognize_intent_scraping(self, intent_recognizer):
+    @pytest.mark.parametrize("message", [
+        pytest.param("scrape https://example.com", id="scrape-url"),
+        pytest.param("extract data from https://test.com", id="extract-url"),
+        pytest.param("get content from website", id="website"),
+        pytest.param("collect information from URL", id="collect-url"),
+    ])
+    def test_recognize_intent_scraping(self, intent_recognizer, message):
         """Test scraping intent recognition"""
-        test_cases = [
-            "scrape https://example.com",
-            "extract data from https://test.com",
-            "get content from website",
-            "collect information from URL"
-        ]
-        
-        for message in test_cases:
-            intent = intent_recognizer.recognize_intent(message)
-            assert intent["type"] == "scraping"
-            assert "confidence" in intent
-            assert intent["confidence"] > 0.5
-    
-    def test_recognize_intent_rag_search(self, intent_recognizer):
+        intent = intent_recognizer.recognize_intent(message)
+        assert intent["type"] == "scraping"
+        assert "confidence" in intent
+        assert intent["confidence"] > 0.5
+    
+    @pytest.mark.parametrize("message", [
+        pytest.param("search for information about machine learning", id="search-info"),
+        pytest.param("find documents about Python programming", id="find-documents"),
+        pytest.param("what do you know about artificial intelligence", id="what-do-you-know"),
+        pytest.param("search in my documents", id="search-documents"),
+    ])
+    def test_recognize_intent_rag_search(self, intent_recognizer, message):
         """Test RAG search intent recognition"""
-        test_cases = [
-            "search for information about machine learning",
-            "find documents about Python programming",
-            "what do you know about artificial intelligence",
-            "search in my documents"
-        ]
-        
-        for message in test_cases:
-            intent = intent_recognizer.recognize_intent(message)
-            assert intent["type"] == "rag_search"
-            assert "confidence" in intent
-            assert intent["confidence"] > 0.5
-    
-    def test_recognize_intent_llm_query(self, intent_recognizer):
+        intent = intent_recognizer.recognize_intent(message)
+        assert intent["type"] == "rag_search"
+        assert "confidence" in intent
+        assert intent["confidence"] > 0.5
+    
+    @pytest.mark.parametrize("message", [
+        pytest.param("explain quantum computing", id="explain"),
+        pytest.param("what is the capital of France", id="question"),
+        pytest.param("help me write a Python function", id="help-write"),
+        pytest.param("generate a summary of this text", id="summarize"),
+    ])
+    def test_recognize_intent_llm_query(self, intent_recognizer, message):
         """Test LLM query intent recognition"""
-        test_cases = [
-            "explain quantum computing",
-            "what is the capital of France",
-            "help me write a Python function",
-            "generate a summary of this text"
-        ]
-        
-        for message in test_cases:
-            intent = intent_recognizer.recognize_intent(message)
-            assert intent["type"] == "llm_query"
-            assert "confidence" in intent
-            assert intent["confidence"] > 0.5
-    
-    def test_recognize_intent_greeting(self, intent_recognizer):
+        intent = intent_recognizer.recognize_intent(message)
+        assert intent["type"] == "llm_query"
+        assert "confidence" in intent
+        assert intent["confidence"] > 0.5
+    
+    @pytest.mark.parametrize("message", [
+        pytest.param("hello", id="hello"),
+        pytest.param("hi there", id="hi-there"),
+        pytest.param("good morning", id="good-morning"),
+        pytest.param("hey, how are you", id="hey"),
+    ])
+    def test_recognize_intent_greeting(self, intent_recognizer, message):
         """Test greeting intent recognition"""
-        test_cases = [
-            "hello",
-            "hi there",
-            "good morning",
-            "hey, how are you"
-        ]
-        
-        for message in test_cases:
-            intent = intent_recognizer.recognize_intent(message)
-            assert intent["type"] == "greeting"
-            assert "confidence" in intent
-            assert intent["confidence"] > 0.5
-    
-    def test_recognize_intent_unknown(self, intent_recognizer):
+        intent = intent_recognizer.recognize_intent(message)
+        assert intent["type"] == "greeting"
+        assert "confidence" in intent
+        assert intent["confidence"] > 0.5
+    
+    @pytest.mark.parametrize("message", [
+        pytest.param("asdfghjkl", id="asdfghjkl"),
+        pytest.param("random text with no meaning", id="random-text"),
+        pytest.param("", id="empty"),
+        pytest.param("   ", id="whitespace"),
+    ])
+    def test_recognize_intent_unknown(self, intent_recognizer, message):
         """Test unknown intent recognition"""
-        test_cases = [
-            "asdfghjkl",
-            "random text with no meaning",
-            "",
-            "   "
-        ]
-        
-        for message in test_cases:
-            intent = intent_recognizer.recognize_intent(message)
-            assert intent["type"] == "unknown"
-            assert "confidence" in intent
-            assert intent["confidence"] < 0.5
+        intent = intent_recognizer.recognize_intent(message)
+        assert intent["type"] == "unknown"
+        assert "confidence" in intent
+        assert intent["confidence"] < 0.5
     
     def test_extract_entities_url(self, intent_recognizer):
         """Test URL entity extraction"""
@@ -276,7 +309,6 @@ class TestConversationManager:
         assert context[0]["content"] == "Message 5"  # Should start from the 5th message
         assert context[-1]["content"] == "Message 14"  # Should end with the last message
     
-    @pytest.mark.asyncio
     async def test_generate_contextual_response(self, conversation_manager):
         """Test generating contextual response"""
         # Add conversation history
@@ -312,7 +344,6 @@ class TestConversationManager:
         context = conversation_manager.get_conversation_context()
         assert len(context) == 5
     
-    @pytest.mark.asyncio
     async def test_enhance_prompt_with_context(self, conversation_manager):
         """Test prompt enhancement with conversation context"""
         conversation_manager.add_message("user", "Explain machine learning")
@@ -340,74 +371,49 @@ class TestVirtualAssistant:
         assert virtual_assistant.conversation_manager is not None
         assert virtual_assistant.is_running is False
     
-    @pytest.mark.asyncio
     async def test_process_greeting_intent(self, virtual_assistant):
         """Test processing greeting intent"""
         result = await virtual_assistant.process_message("Hello!")
         
-        assert isinstance(result, dict)
-        assert result["success"] is True
-        assert result["intent_type"] == "greeting"
-        assert "response" in result
-        assert len(result["response"]) > 0
+        _assert_ok(result, "greeting")
         assert "greeting" in result["response"].lower() or "hello" in result["response"].lower()
     
-    @pytest.mark.asyncio
     async def test_process_scraping_intent(self, virtual_assistant):
         """Test processing scraping intent"""
         result = await virtual_assistant.process_message("scrape https://example.com")
         
-        assert isinstance(result, dict)
-        assert result["success"] is True
-        assert result["intent_type"] == "scraping"
-        assert "response" in result
+        _assert_ok(result, "scraping")
         assert "scraped" in result["response"].lower() or "content" in result["response"].lower()
         
         # Verify scraper was called
         virtual_assistant.scraper.scrape_url.assert_called_once()
     
-    @pytest.mark.asyncio
     async def test_process_rag_search_intent(self, virtual_assistant):
         """Test processing RAG search intent"""
         result = await virtual_assistant.process_message("search for information about Python programming")
         
-        assert isinstance(result, dict)
-        assert result["success"] is True
-        assert result["intent_type"] == "rag_search"
-        assert "response" in result
-        assert len(result["response"]) > 0
+        _assert_ok(result, "rag_search")
         
         # Verify vector store was called
         virtual_assistant.vector_store.search_similar.assert_called_once()
     
-    @pytest.mark.asyncio
     async def test_process_llm_query_intent(self, virtual_assistant):
         """Test processing LLM query intent"""
         result = await virtual_assistant.process_message("explain quantum computing")
         
-        assert isinstance(result, dict)
-        assert result["success"] is True
-        assert result["intent_type"] == "llm_query"
-        assert "response" in result
-        assert len(result["response"]) > 0
-        assert "quantum" in result["response"].lower()
+        _assert_ok(result, "llm_query")
         
-        # Verify LLM router was called
+        # Verify LLM router was called with the user query
         virtual_assistant.llm_router.generate_response.assert_called_once()
+        assert "quantum" in str(virtual_assistant.llm_router.generate_response.call_args).lower()
     
-    @pytest.mark.asyncio
     async def test_process_unknown_intent(self, virtual_assistant):
         """Test processing unknown intent"""
         result = await virtual_assistant.process_message("asdfghjkl")
         
-        assert isinstance(result, dict)
-        assert result["success"] is True
-        assert result["intent_type"] == "unknown"
-        assert "response" in result
-        assert len(result["response"]) > 0
+        _assert_ok(result, "unknown")
         assert "understand" in result["response"].lower() or "clarify" in result["response"].lower()
     
-    @pytest.mark.asyncio
     async def test_process_message_with_error(self, virtual_assistant):
         """Test error handling during message processing"""
         # Make scraper raise an exception
@@ -420,18 +426,19 @@ class TestVirtualAssistant:
         assert "error" in result
         assert "Scraping error" in result["error"]
     
-    def test_start_assistant(self, virtual_assistant):
-        """Test starting the assistant"""
-        virtual_assistant.start()
-        assert virtual_assistant.is_running is True
-    
-    def test_stop_assistant(self, virtual_assistant):
-        """Test stopping the assistant"""
+    def test_assistant_lifecycle(self, virtual_assistant):
+        """Test assistant start/stop lifecycle"""
+        # Start assistant
         virtual_assistant.start()
         assert virtual_assistant.is_running is True
+        status = virtual_assistant.get_status()
+        assert status["is_running"] is True
         
+        # Stop assistant
         virtual_assistant.stop()
         assert virtual_assistant.is_running is False
+        status = virtual_assistant.get_status()
+        assert status["is_running"] is False
     
     def test_get_assistant_status(self, virtual_assistant):
         """Test getting assistant status"""
@@ -443,7 +450,6 @@ class TestVirtualAssistant:
         assert "vector_store_status" in status
         assert "sheets_configured" in status
     
-    @pytest.mark.asyncio
     async def test_conversation_context_persistence(self, virtual_assistant):
         """Test that conversation context is maintained across messages"""
         # First message
@@ -457,7 +463,6 @@ class TestVirtualAssistant:
         # Verify conversation history has both messages
         assert len(virtual_assistant.conversation_manager.conversation_history) >= 2
     
-    @pytest.mark.asyncio
     async def test_sheets_sync_integration(self, virtual_assistant):
         """Test that successful operations sync to Google Sheets"""
         # Process a message that should trigger sheets sync
@@ -479,7 +484,6 @@ class TestVirtualAssistant:
         virtual_assistant.reset_conversation()
         assert len(virtual_assistant.conversation_manager.conversation_history) == 0
     
-    @pytest.mark.asyncio
     async def test_concurrent_message_processing(self, virtual_assistant):
         """Test handling concurrent messages"""
         messages = [
@@ -490,8 +494,9 @@ class TestVirtualAssistant:
         ]
         
         # Process messages concurrently
-        tasks = [virtual_assistant.process_message(msg) for msg in messages]
-        results = await asyncio.gather(*tasks)
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(virtual_assistant.process_message(msg)) for msg in messages]
+        results = [task.result() for task in tasks]
         
         # All messages should be processed successfully
         assert len(results) == len(messages)
@@ -511,22 +516,10 @@ class TestIntentHandlers:
         assert hasattr(base_intent, 'get_name')
         assert base_intent.get_name() == "base"
     
-    @pytest.mark.asyncio
     async def test_intent_handler_registration(self, virtual_assistant):
         """Test registering custom intent handlers"""
-        class CustomIntentHandler(BaseIntent):
-            def get_name(self):
-                return "custom"
-            
-            async def process(self, message: str, entities: Dict[str, Any]) -> Dict[str, Any]:
-                return {
-                    "success": True,
-                    "response": "Custom intent processed",
-                    "data": {"original_message": message}
-                }
-        
         # Register custom handler
-        virtual_assistant.register_intent_handler("custom", CustomIntentHandler())
+        virtual_assistant.register_intent_handler("custom", _CustomIntentHandler())
         
         # Test processing with custom intent
         result = await virtual_assistant._process_intent({"type": "custom"}, "test message")
@@ -537,8 +530,22 @@ class TestIntentHandlers:
 class TestVirtualAssistantIntegration:
     """Integration tests for Virtual Assistant"""
     
+    @pytest.fixture
+    def virtual_assistant(self, shared_virtual_assistant):
+        """Reuse the module assistant, restoring its state after each test"""
+        yield shared_virtual_assistant
+        shared_virtual_assistant.reset_conversation()
+        shared_virtual_assistant.stop()
+        shared_virtual_assistant.scraper.scrape_url = AsyncMock(side_effect=_mock_scrape_url)
+        for service in (
+            shared_virtual_assistant.llm_router,
+            shared_virtual_assistant.vector_store,
+            shared_virtual_assistant.scraper,
+            shared_virtual_assistant.sheets_manager,
+        ):
+            service.reset_mock()
+    
     @pytest.mark.integration
-    @pytest.mark.asyncio
     async def test_full_conversation_workflow(self, virtual_assistant):
         """Test complete conversation workflow"""
         conversation_flow = [
@@ -562,7 +569,6 @@ class TestVirtualAssistantIntegration:
         assert len(virtual_assistant.conversation_manager.conversation_history) > 0
     
     @pytest.mark.integration
-    @pytest.mark.asyncio
     async def test_error_recovery_workflow(self, virtual_assistant):
         """Test error recovery during conversation"""
         # First, make scraper fail
@@ -584,18 +590,3 @@ class TestVirtualAssistantIntegration:
         # Try again - should succeed
         result2 = await virtual_assistant.process_message("scrape https://example.com")
         assert result2["success"] is True
-    
-    @pytest.mark.integration
-    def test_assistant_lifecycle(self, virtual_assistant):
-        """Test assistant start/stop lifecycle"""
-        # Start assistant
-        virtual_assistant.start()
-        assert virtual_assistant.is_running is True
-        status = virtual_assistant.get_status()
-        assert status["is_running"] is True
-        
-        # Stop assistant
-        virtual_assistant.stop()
-        assert virtual_assistant.is_running is False
-        status = virtual_assistant.get_status()
-        assert status["is_running"] is False
\ No newline at end of file
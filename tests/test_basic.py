@@ -1,32 +1,34 @@
 import pytest
 import asyncio
+import importlib.util
 import sys
-from unittest.mock import Mock, patch, MagicMock, AsyncMock
+from unittest.mock import Mock, patch, AsyncMock
 from typing import Dict, Any, List
 from pathlib import Path
+from types import SimpleNamespace
 
 # Adicionar diretório raiz ao PYTHONPATH
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Mock Google APIs
-sys.modules['googleapiclient'] = MagicMock()
-sys.modules['googleapiclient.discovery'] = MagicMock()
-sys.modules['google.oauth2'] = MagicMock()
-sys.modules['google.oauth2.service_account'] = MagicMock()
+# Dependências externas ausentes são substituídas por mocks em conftest.py
+from src.utils.config import Config
+from src.llm.router import LLMResponse
 
-# Mock CustomTkinter
-sys.modules['customtkinter'] = MagicMock()
-sys.modules['customtkinter.windows'] = MagicMock()
-sys.modules['customtkinter.windows.ctk_tk'] = MagicMock()
-sys.modules['customtkinter.windows.widgets'] = MagicMock()
+MODULES_TO_CHECK = (
+    'src.utils.config',
+    'src.scraping.scraper',
+    'src.rag.vector_store',
+    'src.llm.router',
+    'src.assistant.virtual_assistant',
+    'src.sheets.sync_manager',
+    'src.main',
+)
 
-# Mock other dependencies
-sys.modules['chromadb'] = MagicMock()
-sys.modules['sentence_transformers'] = MagicMock()
-sys.modules['selenium'] = MagicMock()
-sys.modules['selenium.webdriver'] = MagicMock()
-sys.modules['selenium.webdriver.chrome'] = MagicMock()
-sys.modules['openai'] = MagicMock()
+
+@pytest.fixture(scope="session")
+def real_config():
+    """Config real construído uma única vez (cria diretórios no disco)"""
+    return Config()
 
 
 class TestBasicFunctionality:
@@ -46,50 +48,33 @@ class TestBasicFunctionality:
         except ImportError as e:
             pytest.fail(f"Falha ao importar módulos: {e}")
     
-    def test_config_creation(self):
+    def test_config_creation(self, real_config):
         """Testa criação de configuração"""
-        from src.utils.config import Config
-        
-        config = Config()
-        assert hasattr(config, 'base_dir')
-        assert hasattr(config, 'config_dir')
-        assert hasattr(config, 'data_dir')
-        assert hasattr(config, 'logs_dir')
+        assert hasattr(real_config, 'base_dir')
+        assert hasattr(real_config, 'config_dir')
+        assert hasattr(real_config, 'data_dir')
+        assert hasattr(real_config, 'logs_dir')
     
-    def test_mock_services_creation(self):
+    def test_mock_services_creation(self, config_mock, scraper_mock, vector_store_mock,
+                                    llm_router_mock, assistant_mock, sheets_mock):
         """Testa criação de serviços com mocks"""
         # Config
-        from src.utils.config import Config
-        config = Mock(spec=Config)
-        config.base_dir = Path("/tmp/test")
-        config.config_dir = Path("/tmp/test/config")
-        config.data_dir = Path("/tmp/test/data")
-        config.logs_dir = Path("/tmp/test/logs")
+        assert config_mock.config_dir == Path("/tmp/test/config")
         
         # Scraper
-        from src.scraping.scraper import WebScraper
-        scraper = Mock(spec=WebScraper)
-        assert scraper is not None
+        assert scraper_mock is not None
         
         # Vector Store
-        from src.rag.vector_store import VectorStore
-        vector_store = Mock(spec=VectorStore)
-        assert vector_store is not None
+        assert vector_store_mock is not None
         
         # LLM Router
-        from src.llm.router import LLMRouter
-        llm_router = Mock(spec=LLMRouter)
-        assert llm_router is not None
+        assert llm_router_mock is not None
         
         # Assistant
-        from src.assistant.virtual_assistant import VirtualAssistant
-        assistant = Mock(spec=VirtualAssistant)
-        assert assistant is not None
+        assert assistant_mock is not None
         
         # Sheets Manager
-        from src.sheets.sync_manager import GoogleSheetsSync
-        sheets_manager = Mock(spec=GoogleSheetsSync)
-        assert sheets_manager is not None
+        assert sheets_mock is not None
 
 
 class TestAsyncOperations:
@@ -137,7 +122,6 @@ class TestAsyncOperations:
         llm_router = Mock()
         
         async def mock_generate_response(prompt):
-            from src.llm.router import LLMResponse
             return LLMResponse(
                 content=f"Mock response to: {prompt[:20]}...",
                 provider="openai",
@@ -158,7 +142,8 @@ class TestAsyncOperations:
 class TestErrorHandling:
     """Testes de tratamento de erros"""
     
-    def test_error_handling_in_scraping(self):
+    @pytest.mark.asyncio
+    async def test_error_handling_in_scraping(self):
         """Testa tratamento de erros no scraping"""
         scraper = Mock()
         
@@ -170,14 +155,11 @@ class TestErrorHandling:
         scraper.scrape_url = mock_scrape_with_error
         
         # Testar URL que causa erro
-        import asyncio
-        try:
-            asyncio.run(scraper.scrape_url("https://error.com"))
-            assert False, "Deveria ter lançado exceção"
-        except Exception as e:
-            assert "Network error" in str(e)
+        with pytest.raises(Exception, match="Network error"):
+            await scraper.scrape_url("https://error.com")
     
-    def test_error_handling_in_vector_store(self):
+    @pytest.mark.asyncio
+    async def test_error_handling_in_vector_store(self):
         """Testa tratamento de erros no vector store"""
         vector_store = Mock()
         
@@ -189,32 +171,25 @@ class TestErrorHandling:
         vector_store.search_similar = mock_search_with_error
         
         # Testar query vazia
-        import asyncio
-        try:
-            asyncio.run(vector_store.search_similar(""))
-            assert False, "Deveria ter lançado exceção"
-        except ValueError as e:
-            assert "Query cannot be empty" in str(e)
+        with pytest.raises(ValueError, match="Query cannot be empty"):
+            await vector_store.search_similar("")
     
-    def test_error_handling_in_llm(self):
+    @pytest.mark.asyncio
+    async def test_error_handling_in_llm(self):
         """Testa tratamento de erros no LLM"""
         llm_router = Mock()
         
         async def mock_generate_with_error(prompt):
             if len(prompt) > 1000:
                 raise ValueError("Prompt too long")
-            return Mock(content="Response")
+            return SimpleNamespace(content="Response")
         
         llm_router.generate_response = mock_generate_with_error
         
         # Testar prompt muito longo
-        import asyncio
-        try:
-            long_prompt = "x" * 1001
-            asyncio.run(llm_router.generate_response(long_prompt))
-            assert False, "Deveria ter lançado exceção"
-        except ValueError as e:
-            assert "Prompt too long" in str(e)
+        long_prompt = "x" * 1001
+        with pytest.raises(ValueError, match="Prompt too long"):
+            await llm_router.generate_response(long_prompt)
 
 
 class TestIntegrationScenarios:
@@ -276,7 +251,7 @@ class TestIntegrationScenarios:
         # Mock LLM
         llm_router = Mock()
         async def mock_generate(prompt):
-            return Mock(content=f"Comprehensive answer based on context: {prompt[:50]}...")
+            return SimpleNamespace(content=f"Comprehensive answer based on context: {prompt[:50]}...")
         llm_router.generate_response = mock_generate
         
         # Executar workflow RAG
@@ -285,7 +260,7 @@ class TestIntegrationScenarios:
         assert len(search_results) == 3
         
         # Construir contexto
-        context = "\n".join([result["content"] for result in search_results])
+        context = "\n".join(result["content"] for result in search_results)
         enhanced_prompt = f"Based on the following context:\n{context}\n\nAnswer: {query}"
         
         # Gerar resposta
@@ -295,19 +270,12 @@ class TestIntegrationScenarios:
     @pytest.mark.asyncio
     async def test_concurrent_operations(self):
         """Testa operações concorrentes"""
-        # Criar múltiplos serviços mock
-        services = []
-        for i in range(5):
-            service = Mock()
-            async def mock_operation(idx=i):
-                await asyncio.sleep(0.1)  # Simular trabalho
-                return f"Result {idx}"
-            service.operation = mock_operation
-            services.append(service)
+        async def op(i):
+            await asyncio.sleep(0.1)  # Simular trabalho
+            return f"Result {i}"
         
         # Executar operações concorrentes
-        tasks = [service.operation() for service in services]
-        results = await asyncio.gather(*tasks)
+        results = await asyncio.gather(*(op(i) for i in range(5)))
         
         assert len(results) == 5
         assert all(result.startswith("Result ") for result in results)
@@ -318,54 +286,37 @@ class TestSystemHealth:
     
     def test_all_modules_available(self):
         """Testa se todos os módulos principais estão disponíveis"""
-        modules_to_check = [
-            'src.utils.config',
-            'src.scraping.scraper',
-            'src.rag.vector_store',
-            'src.llm.router',
-            'src.assistant.virtual_assistant',
-            'src.sheets.sync_manager',
-            'src.main'
+        # find_spec localiza o módulo sem executar seu corpo
+        failed_modules = [
+            (module_name, "não encontrado")
+            for module_name in MODULES_TO_CHECK
+            if importlib.util.find_spec(module_name) is None
         ]
         
-        failed_modules = []
-        for module_name in modules_to_check:
-            try:
-                __import__(module_name, fromlist=[''])
-            except ImportError as e:
-                failed_modules.append((module_name, str(e)))
-        
         if failed_modules:
             error_msg = "Módulos que falharam ao importar:\n"
             for module, error in failed_modules:
                 error_msg += f"  - {module}: {error}\n"
             pytest.fail(error_msg)
     
-    def test_basic_system_initialization(self):
+    def test_basic_system_initialization(self, tmp_path: Path):
         """Testa inicialização básica do sistema"""
-        from src.utils.config import Config
-        from pathlib import Path
-        
-        # Criar configuração temporária
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            
-            # Criar estrutura de diretórios
-            (temp_path / "config").mkdir()
-            (temp_path / "data").mkdir()
-            (temp_path / "logs").mkdir()
-            
-            # Mock config
-            config = Mock(spec=Config)
-            config.base_dir = temp_path
-            config.config_dir = temp_path / "config"
-            config.data_dir = temp_path / "data"
-            config.logs_dir = temp_path / "logs"
-            
-            # Verificar estrutura
-            assert config.config_dir.exists()
-            assert config.data_dir.exists()
-            assert config.logs_dir.exists()
+        # Criar estrutura de diretórios
+        for sub in ("config", "data", "logs"):
+            (tmp_path / sub).mkdir()
+        
+        # Mock config
+        config = SimpleNamespace(
+            base_dir=tmp_path,
+            config_dir=tmp_path / "config",
+            data_dir=tmp_path / "data",
+            logs_dir=tmp_path / "logs",
+        )
+        
+        # Verificar estrutura
+        assert config.config_dir.exists()
+        assert config.data_dir.exists()
+        assert config.logs_dir.exists()
 
 
 if __name__ == "__main__":
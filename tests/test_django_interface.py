@@ -8,28 +8,41 @@ ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.append(str(SRC))
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "webapp.webapp.settings")
 
-import django
-django.setup()
 
-from django.test import Client
+@pytest.fixture(scope="session", autouse=True)
+def _django_setup():
+    """Inicializa o Django quando os testes deste módulo executam.
 
+    Com o pytest-django ativo (padrão, pois pytest.ini define
+    DJANGO_SETTINGS_MODULE), o plugin já chama `django.setup()` antes da
+    coleta e esta chamada não tem efeito; a inicialização tardia só vale
+    ao executar com `-p no:django`.
+    """
+    pytest.importorskip("django")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "webapp.webapp.settings")
+    import django
+    django.setup()
 
-@pytest.mark.django_db
-def test_home_view(client: Client):
-    r = client.get("/")
+
+@pytest.fixture(scope="module")
+def shared_client():
+    """Client único para os testes somente leitura deste módulo."""
+    from django.test import Client
+    return Client()
+
+
+def test_home_view(shared_client):
+    r = shared_client.get("/")
     assert r.status_code == 200
     assert b"Interface Web" in r.content
 
 
-@pytest.mark.django_db
-def test_send_text_view_requires_login(client: Client):
-    r = client.get("/messages/text")
+def test_send_text_view_requires_login(shared_client):
+    r = shared_client.get("/messages/text")
     assert r.status_code in (302, 301)
 
 
-@pytest.mark.django_db
-def test_sessions_manage_view_requires_login(client: Client):
-    r = client.get("/sessions/manage")
+def test_sessions_manage_view_requires_login(shared_client):
+    r = shared_client.get("/sessions/manage")
     assert r.status_code in (302, 301)
@@ -1,19 +1,39 @@
 from pathlib import Path
+import pytest
 from src.gui.env_controls import parse_env_example, read_env_values
 
 
-def test_parse_env_example_reads_pairs(tmp_path: Path) -> None:
-    ex = tmp_path / ".env.example"
+@pytest.fixture(scope="session")
+def env_example_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    ex = tmp_path_factory.mktemp("env") / ".env.example"
     ex.write_text("WAHA_HOST=\nDJANGO_DEBUG=true\nJWT_SECRET=\n", encoding="utf-8")
-    pairs = parse_env_example(ex)
+    return ex
+
+
+@pytest.fixture(scope="session")
+def env_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    env = tmp_path_factory.mktemp("env") / ".env"
+    env.write_text("A=1\nB=2\n# C=3\n", encoding="utf-8")
+    return env
+
+
+def test_parse_env_example_reads_pairs(env_example_file: Path) -> None:
+    pairs = parse_env_example(env_example_file)
     assert ("WAHA_HOST", "") in pairs
     assert ("DJANGO_DEBUG", "true") in pairs
     assert ("JWT_SECRET", "") in pairs
 
 
-def test_read_env_values_reads_dict(tmp_path: Path) -> None:
-    env = tmp_path / ".env"
-    env.write_text("A=1\nB=2\n# C=3\n", encoding="utf-8")
-    data = read_env_values(env)
+def test_read_env_values_reads_dict(env_file: Path) -> None:
+    data = read_env_values(env_file)
     assert data == {"A": "1", "B": "2"}
 
+
+@pytest.mark.parametrize("size", [1, 10_000])
+def test_parse_env_example_many_lines(tmp_path: Path, size: int) -> None:
+    ex = tmp_path / ".env.example"
+    lines = [f"# comentário {i}\n  VAR_{i} = valor {i}\r\n\n" for i in range(size)]
+    ex.write_text("".join(lines), encoding="utf-8")
+    pairs = parse_env_example(ex)
+    assert len(pairs) == size
+    assert pairs[-1] == (f"VAR_{size - 1}", f"valor {size - 1}")
@@ -0,0 +1,37 @@
+import pytest
+
+from src.assistant.virtual_assistant import IntentRecognizer, VirtualAssistant
+
+TEXT = "scrape https://a.com 42"
+
+
+def test_recognize_intent_cache_hit_returns_same_object() -> None:
+    r = IntentRecognizer()
+    assert r.recognize_intent(TEXT) is r.recognize_intent(TEXT)
+
+
+def test_cached_intent_entities_are_immutable() -> None:
+    r = IntentRecognizer()
+    intent = r.recognize_intent(TEXT)
+    with pytest.raises(TypeError):
+        intent.entities["injected"] = 1
+    with pytest.raises(AttributeError):
+        intent.entities["urls"].append("https://evil")
+    assert dict(r.recognize_intent(TEXT).entities) == {
+        "urls": ("https://a.com",),
+        "numbers": (42,),
+    }
+
+
+def test_clear_conversation_history_clears_intent_cache() -> None:
+    assistant = VirtualAssistant()
+    first = assistant.intent_recognizer.recognize_intent(TEXT)
+    assistant.clear_conversation_history()
+    assert assistant.intent_recognizer.recognize_intent(TEXT) is not first
+
+
+def test_clear_conversation_history_for_user_keeps_cache() -> None:
+    assistant = VirtualAssistant()
+    first = assistant.intent_recognizer.recognize_intent(TEXT)
+    assistant.clear_conversation_history("user-1")
+    assert assistant.intent_recognizer.recognize_intent(TEXT) is first
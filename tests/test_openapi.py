@@ -1,20 +1,44 @@
-import json
+from importlib import metadata
 from pathlib import Path
 
-import yaml
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson é opcional
+    from json import loads as json_loads
 
 
-def test_generate_openapi(tmp_path):
-    """Executa o script de geração e valida que os arquivos foram criados e
-    contêm as rotas importantes da API.
-    """
+CACHE_KEY = "openapi/spec"
+
+# Rotas que devem constar tanto no JSON quanto no YAML
+ROUTES = ("/whatsapp/text", "/whatsapp/image", "/whatsapp/ptt")
+
+
+def _package_version(name: str):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _sources_stamp(repo_root: Path) -> list:
+    """Assinatura do resultado: mtime do gerador, da API e dos arquivos de
+    fallback em docs/, mais as versões de fastapi/pydantic."""
+    sources = (
+        repo_root / "scripts" / "generate_openapi.py",
+        repo_root / "src" / "api" / "waha_api.py",
+        repo_root / "docs" / "openapi.json",
+        repo_root / "docs" / "openapi.yaml",
+    )
+    stamp = [p.stat().st_mtime_ns if p.exists() else None for p in sources]
+    return stamp + [_package_version(name) for name in ("fastapi", "pydantic")]
+
+
+def _generate_specs(tmp_path: Path, repo_root: Path) -> tuple:
+    """Gera (ou copia de docs/) os arquivos OpenAPI e retorna o spec JSON
+    e as rotas encontradas no YAML."""
     # tenta executar o gerador a partir do código (se dependências estiverem
     # instaladas). Caso falhe por falta de dependências, utiliza os arquivos
     # já existentes em docs/ no repositório.
-    import sys
-    repo_root = Path(__file__).resolve().parents[1]
-    sys.path.insert(0, str(repo_root))
-
     out = tmp_path / "docs"
     out.mkdir(parents=True, exist_ok=True)
 
@@ -38,22 +62,39 @@ def test_generate_openapi(tmp_path):
     assert json_path.exists(), "openapi.json não foi encontrado"
     assert yaml_path.exists(), "openapi.yaml não foi encontrado"
 
-    with json_path.open("r", encoding="utf-8") as fh:
-        spec_json = json.load(fh)
+    spec_json = json_loads(json_path.read_bytes())
+
+    # O gerador emite ambos do mesmo dict; basta checar as chaves no texto
+    yaml_text = yaml_path.read_bytes()
+    yaml_routes = [route for route in ROUTES if f"{route}:".encode() in yaml_text]
+
+    return spec_json, yaml_routes
+
+
+def test_generate_openapi(tmp_path, request, repo_root):
+    """Executa o script de geração e valida que os arquivos foram criados e
+    contêm as rotas importantes da API.
 
-    with yaml_path.open("r", encoding="utf-8") as fh:
-        spec_yaml = yaml.safe_load(fh)
+    O resultado fica em cache (.pytest_cache) enquanto o gerador, a API,
+    os arquivos em docs/ e as versões de fastapi/pydantic não mudarem.
+    """
+    cache = getattr(request.config, "cache", None)
+    stamp = _sources_stamp(repo_root)
+    cached = cache.get(CACHE_KEY, None) if cache is not None else None
+
+    if cached and cached.get("stamp") == stamp:
+        spec_json, yaml_routes = cached["json"], cached["yaml_routes"]
+    else:
+        spec_json, yaml_routes = _generate_specs(tmp_path, repo_root)
+        if cache is not None:
+            cache.set(CACHE_KEY, {"stamp": stamp, "json": spec_json,
+                                  "yaml_routes": yaml_routes})
 
     # Validações simples
     assert spec_json.get("openapi", "").startswith(
         "3"), "openapi.json inválido"
-    assert "/whatsapp/text" in spec_json.get(
-        "paths", {}), "endpoint /whatsapp/text ausente"
-    assert "/whatsapp/image" in spec_json.get(
-        "paths", {}), "endpoint /whatsapp/image ausente"
-    assert "/whatsapp/ptt" in spec_json.get("paths",
-                                            {}), "endpoint /whatsapp/ptt ausente"
-
-    # YAML deve concordar com JSON
-    assert spec_yaml.get("paths") == spec_json.get(
-        "paths"), "paths divergem entre YAML e JSON"
+    for route in ROUTES:
+        assert route in spec_json.get("paths", {}), f"endpoint {route} ausente"
+
+    # YAML deve conter as mesmas rotas
+    assert yaml_routes == list(ROUTES), "paths divergem entre YAML e JSON"
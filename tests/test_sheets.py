@@ -1,65 +1,94 @@
 import pytest
-import asyncio
-from unittest.mock import Mock, patch, MagicMock, AsyncMock
+from unittest.mock import Mock, patch, AsyncMock
 from typing import Dict, Any, List
 import json
+from dataclasses import dataclass
+from types import SimpleNamespace
 
-# Mock Google API clients before importing
 import sys
-from unittest.mock import MagicMock
 from pathlib import Path
 
 # Adicionar diretório raiz ao PYTHONPATH
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Create mock modules for Google APIs
-mock_google_modules = {
-    'google': MagicMock(),
-    'google.auth': MagicMock(),
-    'googleapiclient': MagicMock(),
-    'googleapiclient.discovery': MagicMock(),
-    'google.oauth2': MagicMock(),
-    'google.oauth2.service_account': MagicMock()
-}
+# Missing Google API modules are stubbed with mocks in conftest.py
+from src.sheets.sync_manager import GoogleSheetsSync
 
-# Setup mocks before importing our modules
-for name, module in mock_google_modules.items():
-    sys.modules[name] = module
 
-from src.sheets.sync_manager import GoogleSheetsSync
-from src.utils.config import Config
+@dataclass(frozen=True)
+class CfgStub:
+    """Lightweight stand-in for Config with only the directory attributes"""
+    base_dir: str = "/tmp/test"
+    config_dir: str = "/tmp/test/config"
+    data_dir: str = "/tmp/test/data"
+    logs_dir: str = "/tmp/test/logs"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_config():
-    """Mock configuration"""
-    config = Mock(spec=Config)
-    config.base_dir = "/tmp/test"
-    config.config_dir = "/tmp/test/config"
-    config.data_dir = "/tmp/test/data"
-    config.logs_dir = "/tmp/test/logs"
-    return config
+    """Mock configuration (immutable, shared by the whole session)"""
+    return CfgStub()
 
 
-@pytest.fixture
-def mock_sheets_service():
-    """Mock Google Sheets service"""
+def _link_sheets_service(service):
+    """Chain spreadsheets()/values() back to the service's own mocks"""
+    service.spreadsheets.return_value = service.spreadsheets
+    service.spreadsheets.values.return_value = service.spreadsheets.values
+
+
+@pytest.fixture(scope="module")
+def shared_sheets_service():
+    """Mock Google Sheets service, built once per module"""
     service = Mock()
     service.spreadsheets = Mock()
-    service.spreadsheets.return_value = service.spreadsheets
     service.spreadsheets.values = Mock()
-    service.spreadsheets.values.return_value = service.spreadsheets.values
+    _link_sheets_service(service)
     return service
 
 
 @pytest.fixture
-def sheets_manager(mock_config, mock_sheets_service):
+def mock_sheets_service(shared_sheets_service):
+    """Shared Sheets service with calls and configured results cleared"""
+    shared_sheets_service.reset_mock(return_value=True, side_effect=True)
+    _link_sheets_service(shared_sheets_service)
+    return shared_sheets_service
+
+
+@pytest.fixture
+def sheets_manager(mock_config, mock_sheets_service, monkeypatch):
     """Create GoogleSheetsSync instance with mocked service"""
-    with patch('googleapiclient.discovery.build', return_value=mock_sheets_service):
-        with patch('google.oauth2.service_account.Credentials.from_service_account_file'):
-            manager = GoogleSheetsSync(mock_config)
-            manager.service = mock_sheets_service
-            yield manager
+    monkeypatch.setattr(sys.modules['googleapiclient.discovery'], 'build',
+                        Mock(return_value=mock_sheets_service))
+    monkeypatch.setattr(sys.modules['google.oauth2.service_account'].Credentials,
+                        'from_service_account_file', Mock())
+    manager = GoogleSheetsSync(mock_config)
+    manager.service = mock_sheets_service
+    return manager
+
+
+@pytest.fixture
+def configured_sheets_manager(sheets_manager):
+    """Configured manager with pre-wired get/update/batchUpdate results
+
+    Returns ``(manager, handles)``; tests tweak ``handles.<op>.execute``
+    instead of rebuilding the Mock chain.
+    """
+    sheets_manager.spreadsheet_id = "test_spreadsheet_id"
+    values = sheets_manager.service.spreadsheets.values
+    
+    get_exec = Mock()
+    get_exec.execute.return_value = {"values": []}
+    values.get.return_value = get_exec
+    
+    upd_exec = Mock()
+    upd_exec.execute.return_value = {"updatedCells": 5}
+    values.update.return_value = upd_exec
+    
+    batch_exec = Mock()
+    batch_exec.execute.return_value = {"replies": [{}, {}]}
+    values.batchUpdate.return_value = batch_exec
+    
+    return sheets_manager, SimpleNamespace(get=get_exec, update=upd_exec, batch_update=batch_exec)
 
 
 class TestGoogleSheetsSync:
@@ -87,63 +116,54 @@ class TestGoogleSheetsSync:
         sheets_manager.spreadsheet_id = "test_spreadsheet_id"
         assert sheets_manager.is_configured()
     
-    def test_configure_with_credentials_file(self, sheets_manager):
+    def test_configure_with_credentials_file(self, sheets_manager, monkeypatch):
         """Test configuration with credentials file"""
-        with patch('pathlib.Path.exists', return_value=True):
-            with patch('google.oauth2.service_account.Credentials.from_service_account_file') as mock_creds:
-                mock_creds.return_value = Mock()
-                
-                result = sheets_manager.configure(
-                    spreadsheet_id="test_id",
-                    credentials_file="/path/to/credentials.json"
-                )
-                
-                assert result is True
-                assert sheets_manager.spreadsheet_id == "test_id"
-                mock_creds.assert_called_once()
+        monkeypatch.setattr(Path, "exists", lambda self: True)
+        mock_creds = Mock(return_value=Mock())
+        monkeypatch.setattr(sys.modules['google.oauth2.service_account'].Credentials,
+                            'from_service_account_file', mock_creds)
+        
+        result = sheets_manager.configure(
+            spreadsheet_id="test_id",
+            credentials_file="/path/to/credentials.json"
+        )
+        
+        assert result is True
+        assert sheets_manager.spreadsheet_id == "test_id"
+        mock_creds.assert_called_once()
     
-    def test_configure_with_credentials_data(self, sheets_manager):
+    def test_configure_with_credentials_data(self, sheets_manager, monkeypatch):
         """Test configuration with credentials data dict"""
-        with patch('pathlib.Path.exists', return_value=False):
-            with patch('json.loads') as mock_json:
-                with patch('google.oauth2.service_account.Credentials.from_service_account_info') as mock_creds:
-                    mock_creds.return_value = Mock()
-                    
-                    credentials_data = {"type": "service_account", "project_id": "test"}
-                    result = sheets_manager.configure(
-                        spreadsheet_id="test_id",
-                        credentials_data=credentials_data
-                    )
-                    
-                    assert result is True
-                    assert sheets_manager.spreadsheet_id == "test_id"
-                    mock_creds.assert_called_once()
+        monkeypatch.setattr(Path, "exists", lambda self: False)
+        monkeypatch.setattr(json, "loads", Mock())
+        mock_creds = Mock(return_value=Mock())
+        monkeypatch.setattr(sys.modules['google.oauth2.service_account'].Credentials,
+                            'from_service_account_info', mock_creds)
+        
+        credentials_data = {"type": "service_account", "project_id": "test"}
+        result = sheets_manager.configure(
+            spreadsheet_id="test_id",
+            credentials_data=credentials_data
+        )
+        
+        assert result is True
+        assert sheets_manager.spreadsheet_id == "test_id"
+        mock_creds.assert_called_once()
     
-    def test_configure_failure(self, sheets_manager):
+    def test_configure_failure(self, sheets_manager, monkeypatch):
         """Test configuration failure handling"""
-        with patch('pathlib.Path.exists', return_value=False):
-            result = sheets_manager.configure(spreadsheet_id="test_id")
-            assert result is False
+        monkeypatch.setattr(Path, "exists", lambda self: False)
+        result = sheets_manager.configure(spreadsheet_id="test_id")
+        assert result is False
     
     def test_sync_scraping_data_not_configured(self, sheets_manager):
         """Test sync when not configured"""
         result = sheets_manager.sync_scraping_data({"test": "data"})
         assert result is False
     
-    def test_sync_scraping_data_success(self, sheets_manager):
+    def test_sync_scraping_data_success(self, configured_sheets_manager):
         """Test successful data sync"""
-        sheets_manager.spreadsheet_id = "test_spreadsheet_id"
-        
-        # Mock the execute method
-        mock_execute = Mock()
-        mock_execute.execute.return_value = {"values": []}
-        
-        sheets_manager.service.spreadsheets.values.get.return_value = mock_execute
-        
-        # Mock the update method
-        mock_update = Mock()
-        mock_update.execute.return_value = {"updatedCells": 5}
-        sheets_manager.service.spreadsheets.values.update.return_value = mock_update
+        sheets_manager, _ = configured_sheets_manager
         
         test_data = {
             "url": "https://example.com",
@@ -161,24 +181,17 @@ class TestGoogleSheetsSync:
         assert call_args[1]['spreadsheetId'] == "test_spreadsheet_id"
         assert 'values' in call_args[1]['body']
     
-    def test_sync_scraping_data_with_existing_data(self, sheets_manager):
+    def test_sync_scraping_data_with_existing_data(self, configured_sheets_manager):
         """Test data sync when data already exists"""
-        sheets_manager.spreadsheet_id = "test_spreadsheet_id"
+        sheets_manager, handles = configured_sheets_manager
         
         # Mock existing data
-        mock_execute = Mock()
-        mock_execute.execute.return_value = {
+        handles.get.execute.return_value = {
             "values": [
                 ["URL", "Title", "Content", "Scraped At"],
                 ["https://existing.com", "Existing", "Content", "2024-01-01"]
             ]
         }
-        sheets_manager.service.spreadsheets.values.get.return_value = mock_execute
-        
-        # Mock the update method
-        mock_update = Mock()
-        mock_update.execute.return_value = {"updatedCells": 5}
-        sheets_manager.service.spreadsheets.values.update.return_value = mock_update
         
         test_data = {
             "url": "https://new.com",
@@ -190,19 +203,9 @@ class TestGoogleSheetsSync:
         result = sheets_manager.sync_scraping_data(test_data)
         assert result is True
     
-    def test_sync_rag_data(self, sheets_manager):
+    def test_sync_rag_data(self, configured_sheets_manager):
         """Test RAG data synchronization"""
-        sheets_manager.spreadsheet_id = "test_spreadsheet_id"
-        
-        # Mock the execute method
-        mock_execute = Mock()
-        mock_execute.execute.return_value = {"values": []}
-        sheets_manager.service.spreadsheets.values.get.return_value = mock_execute
-        
-        # Mock the update method
-        mock_update = Mock()
-        mock_update.execute.return_value = {"updatedCells": 3}
-        sheets_manager.service.spreadsheets.values.update.return_value = mock_update
+        sheets_manager, _ = configured_sheets_manager
         
         test_data = {
             "query": "test query",
@@ -215,19 +218,9 @@ class TestGoogleSheetsSync:
         result = sheets_manager.sync_rag_data(test_data)
         assert result is True
     
-    def test_sync_llm_interactions(self, sheets_manager):
+    def test_sync_llm_interactions(self, configured_sheets_manager):
         """Test LLM interaction sync"""
-        sheets_manager.spreadsheet_id = "test_spreadsheet_id"
-        
-        # Mock the execute method
-        mock_execute = Mock()
-        mock_execute.execute.return_value = {"values": []}
-        sheets_manager.service.spreadsheets.values.get.return_value = mock_execute
-        
-        # Mock the update method
-        mock_update = Mock()
-        mock_update.execute.return_value = {"updatedCells": 4}
-        sheets_manager.service.spreadsheets.values.update.return_value = mock_update
+        sheets_manager, _ = configured_sheets_manager
         
         test_data = {
             "prompt": "test prompt",
@@ -240,19 +233,9 @@ class TestGoogleSheetsSync:
         result = sheets_manager.sync_llm_interactions(test_data)
         assert result is True
     
-    def test_batch_sync_operations(self, sheets_manager):
+    def test_batch_sync_operations(self, configured_sheets_manager):
         """Test batch synchronization of multiple operations"""
-        sheets_manager.spreadsheet_id = "test_spreadsheet_id"
-        
-        # Mock the execute method
-        mock_execute = Mock()
-        mock_execute.execute.return_value = {"values": []}
-        sheets_manager.service.spreadsheets.values.get.return_value = mock_execute
-        
-        # Mock the batch update method
-        mock_batch_update = Mock()
-        mock_batch_update.execute.return_value = {"replies": [{}, {}]}
-        sheets_manager.service.spreadsheets.values.batchUpdate.return_value = mock_batch_update
+        sheets_manager, _ = configured_sheets_manager
         
         operations = [
             {
@@ -271,35 +254,31 @@ class TestGoogleSheetsSync:
         # Verify batch update was called
         sheets_manager.service.spreadsheets.values.batchUpdate.assert_called_once()
     
-    def test_error_handling_api_errors(self, sheets_manager):
+    def test_error_handling_api_errors(self, configured_sheets_manager):
         """Test error handling for API errors"""
-        sheets_manager.spreadsheet_id = "test_spreadsheet_id"
+        sheets_manager, handles = configured_sheets_manager
         
         # Mock API error
-        mock_execute = Mock()
-        mock_execute.execute.side_effect = Exception("API Error")
-        sheets_manager.service.spreadsheets.values.get.return_value = mock_execute
+        handles.get.execute.side_effect = Exception("API Error")
         
         test_data = {"url": "https://example.com", "title": "Test"}
         result = sheets_manager.sync_scraping_data(test_data)
         assert result is False
     
-    def test_error_handling_network_errors(self, sheets_manager):
+    def test_error_handling_network_errors(self, configured_sheets_manager):
         """Test error handling for network errors"""
-        sheets_manager.spreadsheet_id = "test_spreadsheet_id"
+        sheets_manager, handles = configured_sheets_manager
         
         # Mock network timeout
-        mock_execute = Mock()
-        mock_execute.execute.side_effect = TimeoutError("Network timeout")
-        sheets_manager.service.spreadsheets.values.get.return_value = mock_execute
+        handles.get.execute.side_effect = TimeoutError("Network timeout")
         
         test_data = {"url": "https://example.com", "title": "Test"}
         result = sheets_manager.sync_scraping_data(test_data)
         assert result is False
     
-    def test_data_validation(self, sheets_manager):
+    def test_data_validation(self, configured_sheets_manager):
         """Test data validation before sync"""
-        sheets_manager.spreadsheet_id = "test_spreadsheet_id"
+        sheets_manager, _ = configured_sheets_manager
         
         # Test with invalid data
         result = sheets_manager.sync_scraping_data(None)
@@ -309,30 +288,12 @@ class TestGoogleSheetsSync:
         assert result is False
         
         # Test with valid minimal data
-        mock_execute = Mock()
-        mock_execute.execute.return_value = {"values": []}
-        sheets_manager.service.spreadsheets.values.get.return_value = mock_execute
-        
-        mock_update = Mock()
-        mock_update.execute.return_value = {"updatedCells": 1}
-        sheets_manager.service.spreadsheets.values.update.return_value = mock_update
-        
         result = sheets_manager.sync_scraping_data({"url": "https://example.com"})
         assert result is True
     
-    def test_async_sync_operations(self, sheets_manager):
+    async def test_async_sync_operations(self, configured_sheets_manager):
         """Test async versions of sync operations"""
-        sheets_manager.spreadsheet_id = "test_spreadsheet_id"
-        
-        # Mock the execute method
-        mock_execute = Mock()
-        mock_execute.execute.return_value = {"values": []}
-        sheets_manager.service.spreadsheets.values.get.return_value = mock_execute
-        
-        # Mock the update method
-        mock_update = Mock()
-        mock_update.execute.return_value = {"updatedCells": 5}
-        sheets_manager.service.spreadsheets.values.update.return_value = mock_update
+        sheets_manager, _ = configured_sheets_manager
         
         test_data = {
             "url": "https://example.com",
@@ -342,11 +303,7 @@ class TestGoogleSheetsSync:
         }
         
         # Test async sync
-        async def test_async():
-            result = await sheets_manager.async_sync_scraping_data(test_data)
-            return result
-        
-        result = asyncio.run(test_async())
+        result = await sheets_manager.async_sync_scraping_data(test_data)
         assert result is True
 
 
@@ -354,18 +311,9 @@ class TestGoogleSheetsIntegration:
     """Integration tests for Google Sheets functionality"""
     
     @pytest.mark.integration
-    def test_full_sync_workflow(self, sheets_manager):
+    def test_full_sync_workflow(self, configured_sheets_manager):
         """Test complete sync workflow"""
-        sheets_manager.spreadsheet_id = "test_spreadsheet_id"
-        
-        # Mock all Google API calls
-        mock_get = Mock()
-        mock_get.execute.return_value = {"values": []}
-        sheets_manager.service.spreadsheets.values.get.return_value = mock_get
-        
-        mock_update = Mock()
-        mock_update.execute.return_value = {"updatedCells": 10}
-        sheets_manager.service.spreadsheets.values.update.return_value = mock_update
+        sheets_manager, _ = configured_sheets_manager
         
         # Test scraping data sync
         scraping_data = {
@@ -407,10 +355,16 @@ class TestGoogleSheetsIntegration:
         """Test error recovery in sync workflow"""
         sheets_manager.spreadsheet_id = "test_spreadsheet_id"
         
-        # First call fails with network error
-        mock_get_fail = Mock()
-        mock_get_fail.execute.side_effect = [Exception("Network error"), {"values": []}]
-        sheets_manager.service.spreadsheets.values.get.return_value = mock_get_fail
+        # First call fails with network error, the retry gets a response
+        responses = iter([Exception("Network error"), {"values": []}])
+        
+        def execute():
+            response = next(responses)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        
+        sheets_manager.service.spreadsheets.values.get.return_value = SimpleNamespace(execute=execute)
         
         # Second call succeeds
         mock_update = Mock()
@@ -424,12 +378,5 @@ class TestGoogleSheetsIntegration:
         assert result is False
         
         # Simulate retry after error recovery
-        mock_get_fail.execute.side_effect = None
         result = sheets_manager.sync_scraping_data(test_data)
         assert result is True
-
-
-# Cleanup after tests - remove mock modules
-for name in list(mock_google_modules.keys()):
-    if name in sys.modules:
-        del sys.modules[name]
\ No newline at end of file
@@ -1,9 +1,15 @@
-import os
+from types import SimpleNamespace
+
 import jwt
-import asyncio
-from fastapi.testclient import TestClient
+import pytest
+from fastapi.routing import APIRoute
 
-from src.api.waha_api import create_app
+from src.api.waha_api import (
+    PttRequest,
+    RateLimiter,
+    TextMessageRequest,
+    ThumbRequest,
+)
 
 
 class MockClient:
@@ -28,91 +34,114 @@ class MockClient:
         return {"to": to, "url": url, "title": title, "description": description, "image_base64": image_base64, "status": "ok"}
 
 
+# Cliente sem estado: uma única instância serve a todos os testes
+_MOCK_CLIENT = MockClient()
+
+
 def make_token(secret="test_secret", alg="HS256"):
     return jwt.encode({"sub": "tester"}, secret, algorithm=alg)
 
 
-def setup_app(rate_limit=100):
-    os.environ["JWT_SECRET"] = "test_secret"
-    os.environ["JWT_ALG"] = "HS256"
-    os.environ["RATE_LIMIT_PER_MINUTE"] = str(rate_limit)
-    app = create_app()
-    app.state.wpp_client = MockClient()
-    return app
+# Payload constante: o token é gerado uma única vez
+TOKEN = make_token()
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+# Instante fixo para o limitador de taxa
+FIXED_NOW = 1_700_000_000.0
+
+
+API_ENV = {"JWT_SECRET": "test_secret", "JWT_ALG": "HS256", "RATE_LIMIT_PER_MINUTE": "100"}
+
+
+@pytest.fixture(scope="module")
+def api(waha_api):
+    """App e TestClient criados uma única vez para o módulo."""
+    with waha_api(env=API_ENV, wpp_client=_MOCK_CLIENT) as (app, client):
+        yield client, app
+
+
+@pytest.fixture
+def client(api):
+    return api[0]
+
 
+@pytest.fixture
+def limited_client(api):
+    """Client com limitador novo de 1 req/min, restaurado ao final.
 
-def test_auth_required():
-    app = setup_app()
-    client = TestClient(app)
+    O relógio fixo mantém as requisições na mesma janela de um minuto.
+    """
+    client, app = api
+    original = app.state.rate_limiter
+    limiter = RateLimiter(clock=lambda: FIXED_NOW)
+    limiter.limit = 1
+    app.state.rate_limiter = limiter
+    yield client
+    app.state.rate_limiter = original
+
+
+def test_auth_required(client):
     resp = client.post("/whatsapp/text", json={"to": "5511999999999", "message": "oi"})
     assert resp.status_code == 401
 
 
-def test_send_text_success():
-    app = setup_app()
-    client = TestClient(app)
-    token = make_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    resp = client.post("/whatsapp/text", json={"to": "5511999999999", "message": "Olá 👋"}, headers=headers)
-    assert resp.status_code == 200
-    body = resp.json()
+def _endpoint(app, path):
+    """Handler registrado em `path`, para chamada direta sem a pilha ASGI."""
+    return next(r.endpoint for r in app.routes if isinstance(r, APIRoute) and r.path == path)
+
+
+# Payload já decodificado do JWT: a identidade vem de `sub`
+JWT_PAYLOAD = {"sub": "tester"}
+
+# (rota, requisição, verificação do corpo) dos envios bem-sucedidos
+HAPPY_CASES = [
+    pytest.param(
+        "/whatsapp/text",
+        TextMessageRequest(to="5511999999999", message="Olá 👋"),
+        lambda body: body["result"]["message"] == "Olá 👋",
+        id="text",
+    ),
+    pytest.param(
+        "/whatsapp/ptt",
+        PttRequest(to="5511999999999", audio_base64="QmFzZTY0QXVkaW8="),
+        lambda body: True,
+        id="ptt",
+    ),
+    pytest.param(
+        "/whatsapp/thumb",
+        ThumbRequest(to="5511999999999", url="https://example.com", title="Exemplo", description="Desc"),
+        lambda body: True,
+        id="thumb",
+    ),
+]
+
+
+@pytest.mark.parametrize("path,req,check", HAPPY_CASES)
+async def test_send_success(api, path, req, check):
+    # Chamada direta ao handler: autenticação e validação são cobertas
+    # pelos testes via TestClient abaixo
+    _, app = api
+    request = SimpleNamespace(app=app)
+    body = await _endpoint(app, path)(req=req, request=request, payload=JWT_PAYLOAD)
     assert body["success"] is True
-    assert body["result"]["message"] == "Olá 👋"
+    assert check(body)
 
 
-def test_validation_phone_invalid():
-    app = setup_app()
-    client = TestClient(app)
-    token = make_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    resp = client.post("/whatsapp/text", json={"to": "123", "message": "oi"}, headers=headers)
+def test_validation_phone_invalid(client):
+    resp = client.post("/whatsapp/text", json={"to": "123", "message": "oi"}, headers=AUTH)
     assert resp.status_code == 422
 
 
-def test_image_requires_source():
-    app = setup_app()
-    client = TestClient(app)
-    token = make_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    resp = client.post("/whatsapp/image", json={"to": "5511999999999"}, headers=headers)
+def test_image_requires_source(client):
+    resp = client.post("/whatsapp/image", json={"to": "5511999999999"}, headers=AUTH)
     assert resp.status_code == 400
 
 
-def test_rate_limit_exceeded():
-    app = setup_app(rate_limit=1)
-    client = TestClient(app)
-    token = make_token()
-    headers = {"Authorization": f"Bearer {token}"}
+def test_rate_limit_exceeded(limited_client):
+    client = limited_client
     # Primeira requisição deve passar
-    r1 = client.post("/whatsapp/text", json={"to": "5511999999999", "message": "oi"}, headers=headers)
+    r1 = client.post("/whatsapp/text", json={"to": "5511999999999", "message": "oi"}, headers=AUTH)
     assert r1.status_code == 200
     # Segunda na mesma janela deve bloquear
-    r2 = client.post("/whatsapp/text", json={"to": "5511999999999", "message": "oi2"}, headers=headers)
+    r2 = client.post("/whatsapp/text", json={"to": "5511999999999", "message": "oi2"}, headers=AUTH)
     assert r2.status_code == 429
-
-
-def test_send_ptt_success():
-    app = setup_app()
-    client = TestClient(app)
-    token = make_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    audio_b64 = "QmFzZTY0QXVkaW8="
-    resp = client.post("/whatsapp/ptt", json={"to": "5511999999999", "audio_base64": audio_b64}, headers=headers)
-    assert resp.status_code == 200
-    body = resp.json()
-    assert body["success"] is True
-
-
-def test_send_thumb_success():
-    app = setup_app()
-    client = TestClient(app)
-    token = make_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    resp = client.post(
-        "/whatsapp/thumb",
-        json={"to": "5511999999999", "url": "https://example.com", "title": "Exemplo", "description": "Desc"},
-        headers=headers,
-    )
-    assert resp.status_code == 200
-    body = resp.json()
-    assert body["success"] is True
@@ -1,7 +1,5 @@
-import os
 import jwt
 import pytest
-from fastapi.testclient import TestClient
 
 
 class FakeWaha:
@@ -21,64 +19,55 @@ class FakeWaha:
         return {"hookUrl": url, "events": "*", "status": "ok"}
 
 
+# Fake sem estado: uma única instância serve a todos os testes
+_FAKE_WAHA = FakeWaha()
+
+
 def make_token(secret="dev", alg="HS256"):
     return jwt.encode({"sub": "tester"}, secret, algorithm=alg)
 
 
-@pytest.fixture
-def app():
-    os.environ["JWT_SECRET"] = "dev"
-    os.environ["JWT_ALG"] = "HS256"
-    from src.api.waha_api import create_app
-    app = create_app()
-    app.state.wpp_client = FakeWaha()
-    return app
+# Payload constante: o token é gerado uma única vez
+TOKEN = make_token()
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
 
+@pytest.fixture(scope="module")
+def client(waha_api):
+    """Client criado uma única vez para o módulo."""
+    with waha_api(env={"JWT_SECRET": "dev", "JWT_ALG": "HS256"}, wpp_client=_FAKE_WAHA) as (_, c):
+        yield c
 
-def test_session_create(app):
-    client = TestClient(app)
-    token = make_token()
+
+def test_session_create(client):
     r = client.post(
         "/whatsapp/session/create",
         json={"name": "sessao1"},
-        headers={"Authorization": f"Bearer {token}"},
+        headers=AUTH,
     )
     assert r.status_code == 200
     assert r.json()["success"] is True
 
 
-def test_session_start_stop_status(app):
-    client = TestClient(app)
-    token = make_token()
-    r1 = client.post(
-        "/whatsapp/session/start",
-        json={"name": "sessao1"},
-        headers={"Authorization": f"Bearer {token}"},
-    )
-    assert r1.status_code == 200
-
-    r2 = client.get(
-        "/whatsapp/session/sessao1/status",
-        headers={"Authorization": f"Bearer {token}"},
-    )
-    assert r2.status_code == 200
-    assert r2.json()["result"]["status"] == "ready"
-
-    r3 = client.post(
-        "/whatsapp/session/stop",
-        json={"name": "sessao1"},
-        headers={"Authorization": f"Bearer {token}"},
-    )
-    assert r3.status_code == 200
+@pytest.mark.parametrize("method,path,body,expect", [
+    pytest.param("POST", "/whatsapp/session/start", {"name": "sessao1"},
+                 lambda b: b["success"], id="start"),
+    pytest.param("GET", "/whatsapp/session/sessao1/status", None,
+                 lambda b: b["result"]["status"] == "ready", id="status"),
+    pytest.param("POST", "/whatsapp/session/stop", {"name": "sessao1"},
+                 lambda b: b["success"], id="stop"),
+])
+def test_session_start_stop_status(client, method, path, body, expect):
+    r = client.request(method, path, json=body, headers=AUTH)
+    assert r.status_code == 200
+    assert expect(r.json())
 
 
-def test_webhook_register(app):
-    client = TestClient(app)
-    token = make_token()
+def test_webhook_register(client):
     r = client.post(
         "/whatsapp/webhook/register",
         json={"url": "https://example.com/webhook"},
-        headers={"Authorization": f"Bearer {token}"},
+        headers=AUTH,
     )
     assert r.status_code == 200
     body = r.json()
@@ -1,38 +1,28 @@
-import os
 import hmac
 import hashlib
 import pytest
-from fastapi.testclient import TestClient
 
+# Corpo e assinatura HMAC fixos, calculados uma única vez
+RAW = b'{"event": "message", "data": {"text": "hello"}}'
+GOOD_SIG = hmac.new(b"topsecret", RAW, hashlib.sha256).hexdigest()
 
-@pytest.fixture
-def app_with_secret():
-    os.environ["WEBHOOK_SECRET"] = "topsecret"
-    from src.api.waha_api import create_app
-    return create_app()
 
+@pytest.fixture(scope="module")
+def client(waha_api):
+    with waha_api(env={"WEBHOOK_SECRET": "topsecret"}) as (_, c):
+        yield c
 
-def test_webhook_valid_signature(app_with_secret):
-    client = TestClient(app_with_secret)
-    body = {"event": "message", "data": {"text": "hello"}}
-    raw = b'{"event": "message", "data": {"text": "hello"}}'
-    sig = hmac.new(b"topsecret", raw, hashlib.sha256).hexdigest()
 
+@pytest.mark.parametrize("sig,status", [
+    pytest.param(GOOD_SIG, 200, id="valid"),
+    pytest.param("bad", 401, id="invalid"),
+])
+def test_webhook_signature(client, sig, status):
     r = client.post(
         "/whatsapp/webhook/events",
-        data=raw,
+        data=RAW,
         headers={"Content-Type": "application/json", "X-Signature": sig},
     )
-    assert r.status_code == 200
-    assert r.json().get("ok") is True
-
-
-def test_webhook_invalid_signature(app_with_secret):
-    client = TestClient(app_with_secret)
-    raw = b'{"event": "message", "data": {"text": "hello"}}'
-    r = client.post(
-        "/whatsapp/webhook/events",
-        data=raw,
-        headers={"Content-Type": "application/json", "X-Signature": "bad"},
-    )
-    assert r.status_code == 401
+    assert r.status_code == status
+    if status == 200:
+        assert r.json().get("ok") is True
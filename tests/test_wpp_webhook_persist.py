@@ -1,27 +1,33 @@
-import os
-from pathlib import Path
 import pytest
-from fastapi.testclient import TestClient
-
-
-@pytest.fixture
-def app_local_storage(tmp_path):
-    # Garante sem S3
-    os.environ.pop("AWS_S3_BUCKET", None)
-    os.environ.pop("WEBHOOK_SECRET", None)
-    # Ajusta data_dir para um diretório temporário, se possível
-    from src.api.waha_api import create_app
-    app = create_app()
-    try:
-        from utils.config import config
-        config.data_dir = tmp_path  # type: ignore
-    except Exception:
-        pass
-    return app
-
-
-def test_webhook_persist_local(app_local_storage, tmp_path):
-    client = TestClient(app_local_storage)
+
+from src.api.waha_api import LocalFsStorage, get_storage
+
+
+class InMemoryStorage:
+    """Armazenamento em memória: o teste não toca o disco."""
+
+    def __init__(self):
+        self.items = {}
+
+    def save(self, filename, body):
+        self.items[filename] = body
+        return f"mem://{filename}"
+
+
+@pytest.fixture(scope="module")
+def storage():
+    return InMemoryStorage()
+
+
+@pytest.fixture(scope="module")
+def client(waha_api, storage):
+    # Garante sem S3 e sem assinatura
+    with waha_api(unset=("AWS_S3_BUCKET", "WEBHOOK_SECRET"),
+                  overrides={get_storage: lambda: storage}) as (_, c):
+        yield c
+
+
+def test_webhook_persist_local(client, storage):
     raw = b'{"event":"message","data":{"text":"hello"}}'
     r = client.post(
         "/whatsapp/webhook/events",
@@ -32,6 +38,17 @@ def test_webhook_persist_local(app_local_storage, tmp_path):
     body = r.json()
     assert body.get("stored") is True
     loc = body.get("location")
-    assert loc
-    p = Path(loc)
-    assert p.exists()
+    assert loc.startswith("mem://")
+    assert storage.items[loc[len("mem://"):]] == raw
+
+
+def test_local_fs_storage_save(tmp_path):
+    raw = b'{"event":"message"}'
+    loc = LocalFsStorage(tmp_path).save("evt.json", raw)
+    path = tmp_path / "webhooks" / "evt.json"
+    assert loc == str(path)
+    assert path.read_bytes() == raw
+
+
+def test_get_storage_defaults_to_local_fs():
+    assert isinstance(get_storage(), LocalFsStorage)